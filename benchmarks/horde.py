@@ -0,0 +1,81 @@
+import random
+import time
+import tracemalloc
+from src.simulation import headless
+from src.functions import rng
+from src.policy import RandomPolicy
+from src.character import MainCharacterFactory, EnemyFactory
+from src.battle import Battle, HordeBattle
+from src.group import Group
+from src.roster import Roster
+
+SIZES = (10, 100, 1000, 5000)
+REMOVAL_SIZES = (100, 1000, 10000, 50000)
+
+
+# Both sides of a battle with `size` characters each, the same for a given size
+def sides(size: int) -> tuple:
+    rng.seed(size)
+    policy = RandomPolicy()
+    heroes = [MainCharacterFactory().create_character(f"Hero {i}", policy=policy) for i in range(size)]
+    enemies = [EnemyFactory().create_character("") for _ in range(size)]
+    return heroes, enemies
+
+
+# The same sides copied into Rosters, the characters they were built from are dropped
+def roster_sides(size: int) -> tuple:
+    heroes, enemies = Roster(), Roster()
+    for hero, enemy in zip(*sides(size)):
+        heroes.add(hero)
+        enemies.add(enemy)
+    return heroes, enemies
+
+
+# Microseconds per turn of the main loop, building the battle is not timed
+def per_turn(battle) -> float:
+    start = time.perf_counter()
+    battle.main_loop()
+    return (time.perf_counter() - start) / battle.turns * 1e6
+
+
+def horde(size: int, battle_class) -> float:
+    return per_turn(battle_class(*sides(size)))
+
+
+def roster_horde(size: int) -> float:
+    return per_turn(HordeBattle.from_rosters(*roster_sides(size)))
+
+
+# Nanoseconds per removal when a whole side dies in random order. In a full battle
+# a turn costs far more than a death, so Battle and HordeBattle stay equally flat up
+# to a few thousand a side; removals are where a plain list grows with the side.
+def removals(size: int, side_class) -> float:
+    members = [object() for _ in range(size)]
+    order = list(members)
+    random.Random(size).shuffle(order)
+    side = side_class(members)
+    start = time.perf_counter()
+    for member in order:
+        side.remove(member)
+    return (time.perf_counter() - start) / size * 1e9
+
+
+# Bytes held per character once both sides are built
+def footprint(size: int, build) -> float:
+    tracemalloc.start()
+    built = build(size)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del built
+    return held / (2 * size)
+
+
+if __name__ == "__main__":
+    headless()
+    print(f"{'size':>6} {'Battle us/turn':>15} {'HordeBattle us/turn':>20} {'Roster us/turn':>15} {'objects B/char':>15} {'Roster B/char':>14}")
+    for size in SIZES:
+        print(f"{size:>6} {horde(size, Battle):>15.2f} {horde(size, HordeBattle):>20.2f} {roster_horde(size):>15.2f}"
+              f" {footprint(size, sides):>15.0f} {footprint(size, roster_sides):>14.0f}")
+    print(f"\n{'size':>6} {'list ns/removal':>16} {'Group ns/removal':>17}")
+    for size in REMOVAL_SIZES:
+        print(f"{size:>6} {removals(size, list):>16.0f} {removals(size, Group):>17.0f}")
\ No newline at end of file
@@ -0,0 +1,108 @@
+import argparse
+import gc
+import inspect
+import sys
+import tracemalloc
+from src.simulation import headless
+from src.functions import rng
+from src.policy import GreedyPolicy
+from src.character import MainCharacterFactory, ENEMY_POOL, PLANNER, planner_settings
+from src.room import Dungeon, ROOM_POOL
+
+PLANNER_SOURCE = inspect.getfile(type(PLANNER))
+# Bytes the planner may hold per table entry, for keys, values and the table itself
+ENTRY_BYTES = 1024
+
+
+# An endless run: the hero cannot die and travelers who join leave again after the
+# room, so the party stays the same size and only the rooms and enemies keep coming
+def endless(dungeon: Dungeon, rooms: int):
+    hero = dungeon.party[0]
+    for _ in range(rooms):
+        hero.HP, hero.MP = hero.MHP, hero.MMP
+        dungeon.step()
+        dungeon.party[:] = [hero]
+
+
+# Heap after a full collection. Nothing is emptied before it, the planner table included.
+def snapshot() -> tracemalloc.Snapshot:
+    gc.collect()
+    return tracemalloc.take_snapshot()
+
+
+# Growth between a snapshot after the warmup and one after `rooms` more rooms. The planner
+# table is a bounded cache whose dict is resized as entries come and go, so its bytes swing
+# even when full; they are reported apart and checked against the table size instead.
+# table_size replaces the catalog's table size for the run, a small table fills within a
+# short warmup (100000 entries take about 900 rooms). The planner counts nodes instead of
+# time, since tracing slows it down.
+def measure(rooms: int, warmup: int, seed: str = "memory", table_size=None) -> dict:
+    headless()
+    rng.seed(seed)
+    settings = planner_settings()
+    if table_size is not None:
+        settings["table_size"] = table_size
+    PLANNER.configure(**settings)
+    PLANNER.reset()
+    hero = MainCharacterFactory().create_character("Hero", policy=GreedyPolicy())
+    hero.MHP = hero.HP = 10 ** 9
+    dungeon = Dungeon([hero])
+    tracemalloc.start()
+    endless(dungeon, warmup)
+    before = snapshot()
+    misses = ENEMY_POOL.misses, ROOM_POOL.misses
+    endless(dungeon, rooms)
+    after = snapshot()
+    tracemalloc.stop()
+    entries = len(PLANNER.table)
+    PLANNER.configure(**planner_settings())
+    PLANNER.reset(deterministic=False)
+    growth = after.compare_to(before, "lineno")
+    planner = [stat for stat in growth if stat.traceback[0].filename == PLANNER_SOURCE]
+    rest = [stat for stat in growth if stat.traceback[0].filename != PLANNER_SOURCE]
+    return {
+        "rooms": rooms,
+        "blocks": sum(stat.count_diff for stat in rest),
+        "bytes": sum(stat.size_diff for stat in rest),
+        "planner_bytes": sum(stat.size_diff for stat in planner),
+        "planner_held": sum(stat.size for stat in planner),
+        "enemy_misses": ENEMY_POOL.misses - misses[0],
+        "room_misses": ROOM_POOL.misses - misses[1],
+        "planner_entries": entries,
+        "planner_limit": settings["table_size"],
+        "top": [str(stat) for stat in rest[:5] if stat.size_diff > 0],
+    }
+
+
+# What an endless run must hold to: little growth outside the planner, and a planner
+# that stays within its table size
+def failures(result: dict, threshold: int) -> list:
+    failed = []
+    if result["bytes"] > threshold:
+        failed.append(f"grew by {result['bytes']} bytes outside the planner")
+    if result["planner_entries"] > result["planner_limit"]:
+        failed.append(f"planner table has {result['planner_entries']} entries")
+    if result["planner_held"] > result["planner_limit"] * ENTRY_BYTES:
+        failed.append(f"planner holds {result['planner_held']} bytes")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that an endless run holds its memory steady")
+    parser.add_argument("--rooms", type=int, default=2000, help="rooms measured after the warmup")
+    parser.add_argument("--warmup", type=int, default=1000, help="rooms played before the first snapshot")
+    parser.add_argument("--threshold", type=int, default=64 * 1024, help="allowed growth in bytes outside the planner")
+    parser.add_argument("--table-size", type=int, default=None, help="planner table size, the catalog's by default")
+    args = parser.parse_args()
+    result = measure(args.rooms, args.warmup, table_size=args.table_size)
+    print(f"{result['rooms']} rooms: {result['blocks']:+d} blocks, {result['bytes']:+d} bytes, "
+          f"{result['enemy_misses']} new enemies, {result['room_misses']} new rooms, "
+          f"{result['planner_entries']}/{result['planner_limit']} planner entries "
+          f"holding {result['planner_held']} bytes ({result['planner_bytes']:+d})")
+    for line in result["top"]:
+        print(f"  {line}")
+    failed = failures(result, args.threshold)
+    for failure in failed:
+        print(f"FAILED: {failure}")
+    if failed:
+        sys.exit(1)
\ No newline at end of file
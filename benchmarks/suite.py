@@ -0,0 +1,212 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from src.simulation import headless
+from src.functions import rng, dice_roll
+from src.catalog import CATALOG
+from src.policy import GreedyPolicy
+from src.character import MainCharacterFactory, TravelerFactory, EnemyFactory, MimicFactory
+from src.room import Dungeon, EnemyRoomFactory
+from src.battle import Battle, HordeBattle
+from src.skill import PhysicalAttack, MagicalAttack, MagicalHeal
+from benchmarks.horde import sides, roster_sides
+
+CASES = {}
+
+
+# Registers a case: it runs its workload once and returns how many operations it did.
+# What setup returns is passed to the case and building it is not timed.
+def case(name: str, repeat: int = 7, setup=None):
+    def register(function):
+        CASES[name] = (function, repeat, setup)
+        return function
+    return register
+
+
+def party(size: int = 3) -> list:
+    policy = GreedyPolicy()
+    heroes = [MainCharacterFactory().create_character("Hero", policy=policy)]
+    heroes.extend(TravelerFactory().create_character(f"Traveler {i}", policy=policy) for i in range(size - 1))
+    return heroes
+
+
+def skill_for(attack_class):
+    return next(skill for skill in CATALOG.skills.values() if type(skill.use_strategy) is attack_class)
+
+
+@case("dice_roll_1d20")
+def dice_1d20():
+    for _ in range(100000):
+        dice_roll(20, 1)
+    return 100000
+
+
+@case("dice_roll_3d6")
+def dice_3d6():
+    for _ in range(100000):
+        dice_roll(6, 3)
+    return 100000
+
+
+def skill_use(attack_class) -> int:
+    skill = skill_for(attack_class)
+    user = MainCharacterFactory().create_character("Hero", policy=GreedyPolicy())
+    target = EnemyFactory().create_character("")
+    for _ in range(50000):
+        skill.use(user, target)
+    return 50000
+
+
+@case("skill_use_physical")
+def skill_use_physical():
+    return skill_use(PhysicalAttack)
+
+
+@case("skill_use_magical")
+def skill_use_magical():
+    return skill_use(MagicalAttack)
+
+
+@case("skill_use_heal")
+def skill_use_heal():
+    return skill_use(MagicalHeal)
+
+
+@case("apply_damage")
+def apply_damage():
+    heroes = party()
+    enemies = [EnemyFactory().create_character("") for _ in range(3)]
+    battle = Battle(heroes, enemies)
+    skill = skill_for(PhysicalAttack)
+    for _ in range(20000):
+        target = enemies[0]
+        target.HP = target.MHP
+        battle.applyDamage(heroes[0], [target], skill)
+        if target not in battle.enemies:
+            battle.enemies.insert(0, target)
+    return 20000
+
+
+@case("encounter", repeat=5)
+def encounter():
+    factory = EnemyRoomFactory()
+    for depth in range(200):
+        room = factory.create_room(depth, rng)
+        Battle(party(), room.enemies).main_loop()
+    return 200
+
+
+@case("factory_main_character")
+def factory_main():
+    factory = MainCharacterFactory()
+    for _ in range(20000):
+        factory.create_character("Hero")
+    return 20000
+
+
+@case("factory_traveler")
+def factory_traveler():
+    factory = TravelerFactory()
+    for _ in range(20000):
+        factory.create_character("Traveler")
+    return 20000
+
+
+@case("factory_enemy")
+def factory_enemy():
+    factory = EnemyFactory()
+    for _ in range(20000):
+        factory.create_character("")
+    return 20000
+
+
+@case("factory_mimic")
+def factory_mimic():
+    factory = MimicFactory()
+    for _ in range(20000):
+        factory.create_character("Chest")
+    return 20000
+
+
+# Per room of a greedy run capped at 50 rooms
+@case("dungeon_rooms", repeat=5)
+def dungeon_rooms():
+    rooms = 0
+    for _ in range(10):
+        dungeon = Dungeon(party(1))
+        rooms += dungeon.explore(50)
+    return rooms
+
+
+# Per turn of the main loop, numbers comparable with benchmarks/horde.py
+@case("horde_battle_1000", repeat=3, setup=lambda: (HordeBattle(*sides(1000)),))
+def horde_battle(battle):
+    battle.main_loop()
+    return battle.turns
+
+
+@case("horde_roster_1000", repeat=3, setup=lambda: (HordeBattle.from_rosters(*roster_sides(1000)),))
+def horde_roster(battle):
+    battle.main_loop()
+    return battle.turns
+
+
+def measure(name: str) -> dict:
+    function, repeat, setup = CASES[name]
+    timings = []
+    for attempt in range(repeat):
+        rng.seed(f"{name}:{attempt}")
+        arguments = setup() if setup is not None else ()
+        start = time.perf_counter()
+        ops = function(*arguments)
+        timings.append((time.perf_counter() - start) / ops * 1e9)
+    return {"ns_per_op": statistics.median(timings), "best_ns_per_op": min(timings), "ops": ops, "repeat": repeat}
+
+
+def run(names: list) -> dict:
+    headless()
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {name: measure(name) for name in names},
+    }
+
+
+# Flags every case whose median got slower than the baseline by more than the threshold
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    print(f"{'case':<24} {'baseline ns':>14} {'current ns':>14} {'change':>8}")
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]["ns_per_op"]
+        ratio = result["ns_per_op"] / before
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = " REGRESSION"
+        print(f"{name:<24} {before:>14.1f} {result['ns_per_op']:>14.1f} {ratio - 1:>+8.1%}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the hot paths of the game with no terminal I/O")
+    parser.add_argument("--output", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before flagging, 0.10 is 10%%")
+    parser.add_argument("--only", nargs="*", choices=sorted(CASES), default=None, help="run only these cases")
+    args = parser.parse_args()
+    current = run(args.only or list(CASES))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(current, file, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if compare(current, baseline, args.threshold):
+            sys.exit(1)
+    elif not args.output:
+        print(json.dumps(current, indent=2))
\ No newline at end of file
@@ -1,7 +1,41 @@
-from src import MainCharacterFactory, Dungeon
+import argparse
+from src import Dungeon
+from src.replay import Recording, record, replay
+from src.profiler import Profiler
+from src.printer import Printer
 
 if __name__ == "__main__":
-    player_name = input("\nPlease enter your name: ")
-    player = MainCharacterFactory().create_character(player_name)
-    dungeon = Dungeon([player])
-    dungeon.cicle()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="The Endless Tower")
+    parser.add_argument("--seed", type=int, help="play a fixed tower")
+    parser.add_argument("--record", metavar="FILE", help="save the run so it can be replayed")
+    parser.add_argument("--replay", metavar="FILE", help="replay a recorded run without output")
+    parser.add_argument("--checkpoint", metavar="FILE", help="save the run after every room")
+    parser.add_argument("--resume", metavar="FILE", help="continue a run from its checkpoint")
+    parser.add_argument("--profile", metavar="FILE", help="write phase timings and event counts (.prom for Prometheus, JSON otherwise)")
+    parser.add_argument("--log", metavar="FILE", help="append every log entry to a file, written in batches")
+    args = parser.parse_args()
+    if args.profile:
+        Profiler.enable()
+    if args.log:
+        Printer.log.open_sink(args.log)
+
+    if args.replay:
+        recording = Recording.load(args.replay)
+        dungeon = replay(recording)
+        print(f"{recording.name} got through {dungeon.current} rooms ({len(recording.choices)} choices, seed {recording.seed})")
+    elif args.resume:
+        dungeon = Dungeon.load(args.resume, checkpoint=args.checkpoint or args.resume)
+        dungeon.play()
+    else:
+        player_name = input("\nPlease enter your name: ")
+        dungeon, recording = record(player_name, args.seed, args.checkpoint)
+        try:
+            dungeon.cicle()
+        finally:
+            if args.record:
+                recording.save(args.record)
+
+    if args.profile:
+        Profiler.disable().export(args.profile)
+    if args.log:
+        Printer.log.close_sink()
\ No newline at end of file
@@ -0,0 +1,148 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from .enumeration import AttackType, Behavior
+from .scheduler import TurnScheduler
+from .skill import DamageSkill, PhysicalAttack, MagicalAttack, AlliedObjective, AllAlliedObjective, SelfObjective
+
+
+# Resolves many copies of the same encounter at once, one array column per combatant.
+# Heroes follow the "random" or "greedy" policy rules, enemies pick like EnemyCharacter.
+class BatchBattle:
+    def __init__(self, heroes: list, enemies: list, battles: int, policy="random", seed=None):
+        if np is None:
+            raise ImportError("BatchBattle needs numpy installed")
+        self.actors = list(heroes) + list(enemies)
+        if any(character.behavior is Behavior.PLANNER for character in self.actors):
+            raise ValueError("BatchBattle cannot vectorise planner enemies, resolve them with Battle")
+        self.hero_count = len(heroes)
+        self.battles = battles
+        self.policy = policy
+        self.rng = np.random.default_rng(seed)
+        self.MHP = self.column([c.MHP for c in self.actors])
+        self.HP = self.column([c.HP for c in self.actors])
+        self.MP = self.column([c.MP for c in self.actors])
+        self.ATK = self.column([c.get_ATK() for c in self.actors])
+        self.MAG = self.column([c.get_MAG() for c in self.actors])
+        self.DEF = self.column([c.get_DEF() for c in self.actors])
+        self.RES = self.column([c.get_RES() for c in self.actors])
+        self.alive = self.HP > 0
+        self.done = np.zeros(battles, dtype=bool)
+        self.victory = np.zeros(battles, dtype=bool)
+        self.turns = np.zeros(battles, dtype=np.int64)
+
+    def column(self, values: list):
+        return np.tile(np.array(values, dtype=np.int64), (self.battles, 1))
+
+    def sides(self, actor: int) -> tuple:
+        heroes = np.arange(0, self.hero_count)
+        enemies = np.arange(self.hero_count, len(self.actors))
+        if actor < self.hero_count:
+            return heroes, enemies
+        return enemies, heroes
+
+    def target_side(self, actor: int, skill):
+        allies, foes = self.sides(actor)
+        if isinstance(skill.target_strategy, SelfObjective):
+            return np.array([actor])
+        if isinstance(skill.target_strategy, (AlliedObjective, AllAlliedObjective)):
+            return allies
+        return foes
+
+    def greedy(self, actor: int) -> bool:
+        return self.policy == "greedy" and actor < self.hero_count
+
+    def choose_skills(self, actor: int, rows):
+        skills = self.actors[actor].skills
+        cost = np.array([skill.cost for skill in skills])
+        usable = self.MP[rows, actor][:, None] >= cost[None, :]
+        if not self.greedy(actor):
+            keys = self.rng.random(usable.shape)
+            keys[~usable] = -1
+            return keys.argmax(axis=1)
+        allies, foes = self.sides(actor)
+        heal = np.array([skill.type == AttackType.HEAL for skill in skills])
+        area = np.array([skill.target_strategy.area for skill in skills])
+        mean = np.array([s.use_strategy.power + s.use_strategy.dice * (s.use_strategy.die + 1) / 2 for s in skills])
+        ally_alive = self.alive[rows][:, allies]
+        foe_count = self.alive[rows][:, foes].sum(axis=1)
+        count = np.where(heal[None, :], ally_alive.sum(axis=1)[:, None], foe_count[:, None])
+        score = mean[None, :] * np.where(area[None, :], count, 1)
+        # Same ordering as max() over (score, -cost), earliest skill wins ties
+        keys = score * 1e6 - cost[None, :] * 1e3 - np.arange(len(skills))[None, :]
+        hurt = (ally_alive & (self.HP[rows][:, allies] * 2 < self.MHP[rows][:, allies])).any(axis=1)
+        use_heal = hurt & (usable & heal[None, :]).any(axis=1)
+        candidates = usable & np.where(use_heal[:, None], heal[None, :], ~heal[None, :])
+        keys[~candidates] = -np.inf
+        return keys.argmax(axis=1)
+
+    def pick_targets(self, actor: int, rows, side):
+        alive = self.alive[rows][:, side]
+        if not self.greedy(actor):
+            keys = self.rng.random(alive.shape)
+            keys[~alive] = -1
+            return side[keys.argmax(axis=1)]
+        ratio = self.HP[rows][:, side] / self.MHP[rows][:, side]
+        ratio[~alive] = np.inf
+        return side[ratio.argmin(axis=1)]
+
+    def strike(self, actor: int, rows, targets, skill):
+        attack = skill.use_strategy
+        roll = self.rng.integers(1, attack.die + 1, size=(len(rows), attack.dice)).sum(axis=1)
+        if isinstance(attack, PhysicalAttack):
+            value = np.maximum(1, attack.power + roll + self.ATK[rows, actor] - self.DEF[rows, targets])
+        elif isinstance(attack, MagicalAttack):
+            value = np.maximum(1, attack.power + roll + self.MAG[rows, actor] - self.RES[rows, targets])
+        else:
+            value = attack.power + roll + self.MAG[rows, actor]
+        if isinstance(skill, DamageSkill):
+            hit = self.rng.integers(1, 21, size=len(rows))
+            value = np.where(hit == 20, value * 2, value)
+            landed = hit != 1
+            rows, targets, value = rows[landed], targets[landed], value[landed]
+        if skill.type == AttackType.HEAL:
+            self.HP[rows, targets] = np.minimum(self.HP[rows, targets] + value, self.MHP[rows, targets])
+        else:
+            self.HP[rows, targets] = np.maximum(self.HP[rows, targets] - value, 0)
+        self.alive[rows, targets] = self.HP[rows, targets] > 0
+
+    def act(self, actor: int):
+        rows = np.flatnonzero(self.alive[:, actor] & ~self.done)
+        if rows.size == 0:
+            return
+        self.turns[rows] += 1
+        skills = self.actors[actor].skills
+        choice = self.choose_skills(actor, rows)
+        for index, skill in enumerate(skills):
+            chosen = rows[choice == index]
+            if chosen.size == 0:
+                continue
+            if actor < self.hero_count:
+                self.MP[chosen, actor] -= skill.cost
+            side = self.target_side(actor, skill)
+            if skill.target_strategy.area:
+                for target in side:
+                    hit = chosen[self.alive[chosen, target]]
+                    self.strike(actor, hit, np.full(hit.size, target), skill)
+            else:
+                self.strike(actor, chosen, self.pick_targets(actor, chosen, side), skill)
+        heroes_alive = self.alive[rows, :self.hero_count].any(axis=1)
+        enemies_alive = self.alive[rows, self.hero_count:].any(axis=1)
+        self.victory[rows] = heroes_alive & ~enemies_alive
+        self.done[rows] |= ~heroes_alive | ~enemies_alive
+
+    # Follows the same speed-based turn order as Battle, which does not depend on the rolls
+    def run(self, max_rounds=1000):
+        scheduler = TurnScheduler()
+        for slot, character in enumerate(self.actors):
+            scheduler.add(character, slot, character.get_SPD())
+        slots = {id(character): slot for slot, character in enumerate(self.actors)}
+        for _ in range(max_rounds * len(self.actors)):
+            self.act(slots[id(scheduler.next(lambda character: True))])
+            if self.done.all():
+                break
+        return self
+
+    def win_rate(self) -> float:
+        return float(self.victory.mean())
\ No newline at end of file
@@ -1,14 +1,41 @@
+from .functions import rng
 from .printer import Printer
-from .enumeration import HitType
-from .functions import wait_button
-from .character import PlayableCharacter
+from .enumeration import HitType, LogLevel, Behavior
+from .group import Group
+from .scheduler import TurnScheduler
+from .journal import Journal
+
+# Battle fields, turn queue and random state at a checkpoint, plus where the journal was.
+# Taking one leaves the random stream alone, so a checkpoint that is never rolled back
+# changes nothing in the game.
+class BattleCheckpoint:
+    __slots__ = ("size", "victory", "over", "turns", "schedule", "state")
+
+    def __init__(self, battle):
+        self.size = len(battle.journal)
+        self.victory = battle.victory
+        self.over = battle.over
+        self.turns = battle.turns
+        self.schedule = battle.scheduler.snapshot()
+        self.state = rng.getstate()
+
 
 class Battle:
+    # Told about every hit (after it lands), death and finished battle; empty unless
+    # something is collecting, so normal play only pays for the emptiness checks
+    listeners = []
+
     def __init__(self, heroes: list, enemies: list):
         self.heroes = heroes
         self.enemies = enemies
         self.printer = Printer()
         self.victory = False
+        self.over = False
+        self.turns = 0
+        self.journal = None
+        self.scheduler = TurnScheduler()
+        for order, character in enumerate([*heroes, *enemies]):
+            self.scheduler.add(character, order, character.get_SPD())
     
     def check_HP(self, character):
         if character.HP < 1:
@@ -17,11 +44,12 @@ class Battle:
         return False
 
     def remove_character(self, character):
-        if isinstance(character, PlayableCharacter):
-            self.heroes.remove(character)
-            self.printer.add_log(f"- {character.name} died")
-        else:
-            self.enemies.remove(character)
+        side = self.heroes if character.behavior is Behavior.PLAYABLE else self.enemies
+        if self.journal is not None:
+            self.journal.record(side.insert, side.index(character), character)
+        side.remove(character)
+        if side is self.heroes:
+            self.printer.add_log(f"- {character.name} died", LogLevel.WARNING)
     
     def end_condition(self) -> bool:
         if len(self.heroes) == 0:
@@ -47,57 +75,126 @@ class Battle:
                 self.printer.show_hp(target)
                 if self.check_HP(target):
                     defeated.append(target)
+            if self.listeners:
+                for listener in self.listeners:
+                    listener.on_hit(user, target, skill, damage)
         for char in defeated:
             self.remove_character(char)
+            if self.listeners:
+                for listener in self.listeners:
+                    listener.on_death(char, user)
 
 
-    def main_loop(self):
+    def hero_turn(self, hero):
+        self.printer.show_turn_start(hero)
+        while True:
+            self.printer.show_skills(hero, enemies=self.enemies)
+            skill = hero.choose_action(allies=self.heroes, enemies=self.enemies)
+            if skill:
+                if hero.check_MP(skill.cost):   
+                    targets = skill.target_strategy.candidates(user=hero, allies=self.heroes, enemies=self.enemies)
+                    if not targets[0] is None:
+                        hero.change_MP(-skill.cost)
+                        self.applyDamage(user=hero, targets=targets, skill=skill)
+                        break
+                else:
+                    self.printer.insuficient_MP(hero)
+            else:
+                self.printer.pass_turn(hero)
+                break
+        self.printer.show_health(hero)
+        self.printer.wait()
+
+    def enemy_turn(self, enemy):
+        self.printer.show_turn_start(enemy)
+        if enemy.behavior is Behavior.PLANNER:
+            enemy.plan(allies=self.enemies, enemies=self.heroes, upcoming=self.scheduler.upcoming(enemy.planner.max_depth))
+        skill = enemy.choose_action(allies=self.enemies, enemies=self.heroes)
+        targets = skill.target_strategy.candidates(user=enemy, allies=self.enemies, enemies=self.heroes)
+        self.applyDamage(user=enemy, targets=targets, skill=skill)
+        self.printer.show_health(enemy)
+        self.printer.wait()
+
+    def start(self):
         self.printer.message("Battle starts!")
-        on_battle = True
-        self.printer.add_log("- Battle started")
+        self.printer.add_log("- Battle started", LogLevel.DEBUG)
         self.printer.message("\nYour party:")
         self.printer.show_characters(self.heroes)
         self.printer.message("\nEnemy group:")
         self.printer.show_characters(self.enemies)
-        wait_button()
-        while on_battle:
-            # Player's team
-            for hero in self.heroes:
-                self.printer.show_turn_start(hero)
-                while True:
-                    self.printer.show_skills(hero)
-                    skill = hero.choose_action()
-                    if skill:
-                        if hero.check_MP(skill.cost):   
-                            targets = skill.target_strategy.candidates(user=hero, allies=self.heroes, enemies=self.enemies)
-                            if not targets[0] is None:
-                                hero.change_MP(-skill.cost)
-                                self.applyDamage(user=hero, targets=targets, skill=skill)
-                                break
-                        else:
-                            self.printer.insuficient_MP(hero)
-                    else:
-                        self.printer.pass_turn(hero)
-                        break
-                self.printer.show_health(hero)
-                wait_button()
-                if self.end_condition():
-                    on_battle = False
-                    break
-            # Enemy team
-            for enemy in self.enemies:
-                self.printer.show_turn_start(enemy)
-                skill = enemy.choose_action()
-                targets = skill.target_strategy.candidates(user=enemy, allies=self.enemies, enemies=self.heroes)
-                self.applyDamage(user=enemy, targets=targets, skill=skill)
-                self.printer.show_health(enemy)
-                wait_button()
-                if self.end_condition():
-                    on_battle = False
-                    break
-                
+        self.printer.wait()
+
+    # Plays the next action in turn order, returns the actor or None once the battle is over.
+    # With a checkpoint open, the battle's journal is active only while its own step runs.
+    def step(self):
+        if self.over:
+            return None
+        if self.journal is None:
+            return self.turn()
+        outer, Journal.active = Journal.active, self.journal
+        try:
+            return self.turn()
+        finally:
+            Journal.active = outer
+
+    def turn(self):
+        actor = self.scheduler.next(lambda character: character.HP > 0)
+        self.turns += 1
+        if actor.behavior is Behavior.PLAYABLE:
+            self.hero_turn(actor)
+        else:
+            self.enemy_turn(actor)
+        if actor.modifiers:
+            actor.tick()
+        self.over = self.end_condition()
+        return actor
+
+    def finish(self):
+        self.commit()
+        for hero in self.heroes:
+            hero.clear_timed()
+        if self.listeners:
+            for listener in self.listeners:
+                listener.on_finish(self)
         if self.victory:
             self.printer.show_victory()
         else:
             self.printer.show_defeat()
-        return self.heroes
\ No newline at end of file
+        return self.heroes
+
+    def main_loop(self):
+        self.start()
+        while not self.over:
+            self.step()
+        return self.finish()
+
+    # What-if exploration: checkpoint, play some steps, roll back. The changes made by
+    # step() are journaled from the first checkpoint until commit or the end of the battle,
+    # the turn queue is copied on write.
+    def checkpoint(self) -> BattleCheckpoint:
+        if self.journal is None:
+            self.journal = Journal()
+        return BattleCheckpoint(self)
+
+    def rollback(self, mark: BattleCheckpoint):
+        self.journal.rollback(mark.size)
+        self.victory = mark.victory
+        self.over = mark.over
+        self.turns = mark.turns
+        self.scheduler.restore(mark.schedule)
+        rng.setstate(mark.state)
+
+    # Keeps the current state and stops journaling
+    def commit(self):
+        self.journal = None
+
+
+# Battle between large groups, each side is a Group so removals stay O(1)
+class HordeBattle(Battle):
+    def __init__(self, heroes, enemies):
+        super().__init__(Group(heroes), Group(enemies))
+
+    # Sides kept in Rosters, every combatant is a view into their columns
+    @classmethod
+    def from_rosters(cls, heroes, enemies) -> "HordeBattle":
+        return cls(heroes.alive(), enemies.alive())
\ No newline at end of file
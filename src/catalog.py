@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import pickle
+import sys
+from .enumeration import AttackType
+from .sampling import SpawnTable
+from .modifier import Modifier
+from .skill import DamageSkill, HealingSkill, EnemyObjective, AlliedObjective, AllEnemyObjective, AllAlliedObjective, SelfObjective, PhysicalAttack, MagicalAttack, MagicalHeal
+
+DATA = os.path.join(os.path.dirname(__file__), "data", "content.json")
+CACHE = os.path.join(os.path.dirname(__file__), "data", "content.cache")
+SKILL_CLASSES = {cls.__name__: cls for cls in (DamageSkill, HealingSkill)}
+OBJECTIVES = {cls.__name__: cls for cls in (EnemyObjective, AlliedObjective, AllEnemyObjective, AllAlliedObjective, SelfObjective)}
+ATTACKS = {cls.__name__: cls for cls in (PhysicalAttack, MagicalAttack, MagicalHeal)}
+
+
+# Digest of the modules whose code compiles the catalog or whose classes are pickled in it,
+# so the cache is also rebuilt when the compiler or the schema changes
+def source_digest() -> str:
+    digest = hashlib.sha256()
+    for module in sorted({__name__, DamageSkill.__module__, SpawnTable.__module__, Modifier.__module__}):
+        with open(sys.modules[module].__file__, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+# Prebuilt stat line and skill set, instantiated by the character factories
+class CharacterTemplate:
+    __slots__ = ("name", "HP", "MP", "ATK", "MAG", "DEF", "RES", "SPD", "skills")
+
+    def __init__(self, name: str, HP: int, MP: int, ATK: int, MAG: int, DEF: int, RES: int, SPD: int, skills: tuple):
+        self.name = name
+        self.HP = HP
+        self.MP = MP
+        self.ATK = ATK
+        self.MAG = MAG
+        self.DEF = DEF
+        self.RES = RES
+        self.SPD = SPD
+        self.skills = skills
+
+    def create(self, character_class, name=None, **extra):
+        character = character_class(name=self.name if name is None else name, HP=self.HP, MP=self.MP, ATK=self.ATK, MAG=self.MAG, DEF=self.DEF, RES=self.RES, SPD=self.SPD, **extra)
+        character.skills = list(self.skills)
+        return character
+
+
+class Catalog:
+    def __init__(self, skills: dict, hero, travelers: tuple, mimic, enemies: tuple, rooms: dict, spawns: dict, planner: dict, modifiers: dict):
+        self.skills = skills
+        self.hero = hero
+        self.travelers = travelers
+        self.mimic = mimic
+        self.enemies = enemies
+        self.fountains = tuple(rooms["fountains"])
+        self.battles = tuple(rooms["battles"])
+        self.traveler_rooms = tuple(rooms["travelers"])
+        self.mimics = tuple(rooms["mimics"])
+        self.names = tuple(rooms["names"])
+        templates = {template.name: template for template in enemies}
+        self.room_spawns = spawn_table(spawns, "rooms", str)
+        self.enemy_counts = spawn_table(spawns, "enemy_count", int)
+        self.enemy_spawns = spawn_table(spawns, "enemies", templates.__getitem__)
+        self.planner = dict(planner)
+        self.modifiers = modifiers
+
+
+# Weights are [base, per room] pairs, so spawns can shift as the party climbs
+def spawn_table(spawns: dict, table: str, key) -> SpawnTable:
+    entries = spawns[table]
+    return SpawnTable(items=[key(name) for name in entries], weights=[tuple(weight) for weight in entries.values()],
+                      bucket=spawns["bucket"], cap=spawns["cap"])
+
+
+def build_skill(data: dict):
+    attack = ATTACKS[data["attack"]](power=data["power"], die=data["die"], dice=data["dice"])
+    return SKILL_CLASSES[data["class"]](name=data["name"], description=data["description"], attack_type=AttackType[data["type"]],
+                                        target_strategy=OBJECTIVES[data["target"]](), use_strategy=attack, cost=data["cost"])
+
+
+def build_template(data: dict, skills: dict) -> CharacterTemplate:
+    return CharacterTemplate(name=data.get("name"), HP=data["HP"], MP=data["MP"], ATK=data["ATK"], MAG=data["MAG"], DEF=data["DEF"],
+                             RES=data["RES"], SPD=data.get("SPD", 10), skills=tuple(skills[skill] for skill in data["skills"]))
+
+
+def compile_catalog(content: dict) -> Catalog:
+    skills = {skill_id: build_skill(data) for skill_id, data in content["skills"].items()}
+    return Catalog(skills=skills,
+                   hero=build_template(content["hero"], skills),
+                   travelers=tuple(build_template(data, skills) for data in content["travelers"]),
+                   mimic=build_template(content["mimic"], skills),
+                   enemies=tuple(build_template(data, skills) for data in content["enemies"]),
+                   rooms=content["rooms"],
+                   spawns=content["spawns"],
+                   planner=content["planner"],
+                   modifiers={modifier_id: Modifier(**data) for modifier_id, data in content["modifiers"].items()})
+
+
+# Compiled catalogs are pickled next to the data and rebuilt whenever the data file or
+# the compiling code changes. A cache that cannot be unpickled is rebuilt as well.
+def load_catalog(path: str = DATA, cache: str = CACHE) -> Catalog:
+    stamp = (os.stat(path).st_mtime_ns, source_digest())
+    try:
+        with open(cache, "rb") as file:
+            cached_stamp, catalog = pickle.load(file)
+        if cached_stamp == stamp and isinstance(catalog, Catalog):
+            return catalog
+    except Exception:
+        pass
+    with open(path, encoding="utf-8") as file:
+        catalog = compile_catalog(json.load(file))
+    try:
+        with open(cache, "wb") as file:
+            pickle.dump((stamp, catalog), file, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+    return catalog
+
+
+CATALOG = load_catalog()
+
+
+# Replaces the content of the shared catalog in place, so every module holding CATALOG sees it
+def install_catalog(catalog: Catalog):
+    CATALOG.__dict__.update(catalog.__dict__)
\ No newline at end of file
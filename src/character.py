@@ -1,13 +1,32 @@
 from abc import ABC, abstractmethod
-import random
 from .enumeration import Behavior, AttackType
-from .functions import choose_option
-from .skill import Skill, DamageSkill, HealingSkill, EnemyObjective, AlliedObjective, AllEnemyObjective, AllAlliedObjective, PhysicalAttack, MagicalAttack, MagicalHeal
+from .functions import rng
+from .policy import HumanPolicy
+from .skill import Skill
+from .planner import Planner
+from .journal import Journal
+from .modifier import StatBlock
+from .catalog import CATALOG
+from .printer import render_bar
+from .pool import Pool
+
+# Planner limits from the planner section of a catalog
+def planner_settings(catalog=CATALOG) -> dict:
+    return {"budget": catalog.planner["budget_ms"] / 1000, "nodes": catalog.planner["nodes"],
+            "max_depth": catalog.planner["max_depth"], "table_size": catalog.planner["table_size"]}
+
+
+# One planner for every enemy, so they share the transposition table
+PLANNER = Planner(**planner_settings())
+# Enemies of finished rooms by (class, template), reset and reused by the factories
+ENEMY_POOL = Pool()
 
 
 class Character(ABC):
+    __slots__ = ("name", "MHP", "HP", "MMP", "MP", "ATK", "MAG", "DEF", "RES", "SPD", "skills", "behavior", "modifiers", "effective")
+
     @abstractmethod
-    def __init__(self, name: str, HP: int, MP: int, ATK: int, MAG: int, DEF: int, RES: int):
+    def __init__(self, name: str, HP: int, MP: int, ATK: int, MAG: int, DEF: int, RES: int, SPD: int = 10):
         self.name = name
         self.MHP = HP
         self.HP = HP
@@ -17,26 +36,80 @@ class Character(ABC):
         self.MAG = MAG
         self.DEF = DEF
         self.RES = RES
+        self.SPD = SPD
         self.skills = []
         self.behavior: Behavior = None
+        # Active (modifier, turns left) pairs and the stat block they produce, None without any
+        self.modifiers = ()
+        self.effective = None
     
     def get_ATK(self):
-        return self.ATK
+        return self.ATK if self.effective is None else self.effective.ATK
     def get_DEF(self):
-        return self.DEF
+        return self.DEF if self.effective is None else self.effective.DEF
     def get_MAG(self):
-        return self.MAG
+        return self.MAG if self.effective is None else self.effective.MAG
     def get_RES(self):
-        return self.RES
+        return self.RES if self.effective is None else self.effective.RES
+    def get_SPD(self):
+        return self.SPD if self.effective is None else self.effective.SPD
+
+    def set_modifiers(self, modifiers: tuple):
+        if Journal.active is not None:
+            Journal.active.record(self.load_modifiers, self.modifiers)
+        self.load_modifiers(modifiers)
+
+    # Sets the modifiers without journaling, also used to undo
+    def load_modifiers(self, modifiers: tuple):
+        self.modifiers = modifiers
+        self.effective = StatBlock(self, modifiers) if modifiers else None
+
+    def add_modifier(self, modifier):
+        self.set_modifiers(self.modifiers + ((modifier, modifier.turns),))
+
+    def remove_modifier(self, modifier):
+        for index, (active, _) in enumerate(self.modifiers):
+            if active is modifier:
+                self.set_modifiers(self.modifiers[:index] + self.modifiers[index + 1:])
+                return
+
+    # Called after each of the bearer's turns, timed modifiers run out here
+    def tick(self):
+        if not any(modifier.timed for modifier, _ in self.modifiers):
+            return
+        ticked = tuple((modifier, None if turns is None else turns - 1) for modifier, turns in self.modifiers)
+        self.set_modifiers(tuple((modifier, turns) for modifier, turns in ticked if turns is None or turns > 0))
+
+    def clear_timed(self):
+        if any(modifier.timed for modifier, _ in self.modifiers):
+            self.set_modifiers(tuple((modifier, turns) for modifier, turns in self.modifiers if not modifier.timed))
 
     @abstractmethod
-    def choose_action(self) -> Skill:
+    def choose_action(self, allies: list, enemies: list) -> Skill:
         pass
 
     @abstractmethod
     def pick_target(self, targets):
         pass
 
+    @abstractmethod
+    def confirm_targets(self, targets) -> bool:
+        pass
+
+    # Back to the state template.create(type(self), name) builds, reusing this object
+    def reset(self, template, name=None):
+        self.name = template.name if name is None else name
+        self.MHP = self.HP = template.HP
+        self.MMP = self.MP = template.MP
+        self.ATK = template.ATK
+        self.MAG = template.MAG
+        self.DEF = template.DEF
+        self.RES = template.RES
+        self.SPD = template.SPD
+        self.skills[:] = template.skills
+        self.load_modifiers(())
+        return self
+
     def check_MP(self, cost: int) -> bool:
         return self.MP >= cost
 
@@ -44,6 +117,8 @@ class Character(ABC):
         self.skills.append(skill)
 
     def change_HP(self, ammount: int):
+        if Journal.active is not None:
+            Journal.active.record(setattr, self, "HP", self.HP)
         self.HP += ammount
         if self.HP > self.MHP:
             self.HP = self.MHP
@@ -51,6 +126,8 @@ class Character(ABC):
             self.HP = 0
     
     def change_MP(self, ammount: int):
+        if Journal.active is not None:
+            Journal.active.record(setattr, self, "MP", self.MP)
         self.MP += ammount
         if self.MP > self.MMP:
             self.MP = self.MMP
@@ -58,19 +135,10 @@ class Character(ABC):
             self.MP = 0
 
     def health_bar(self) -> str:
-        percent = self.HP/self.MHP * 10
-        dec = int(percent)
-        partial = percent % 1 > 0
-        return ("HP: [" + "X" * dec + "/" * partial + "-" * (10 - dec - partial) + f"] ({self.HP}/{self.MHP})")
+        return render_bar("HP", self.HP, self.MHP)
     
     def mana_bar(self) -> str:
-        if self.MMP > 0:
-            percent = self.MP/self.MMP * 10
-        else:
-            percent = 0
-        dec = int(percent)
-        partial = percent % 1 > 0
-        return ("MP: [" + "X" * dec + "/" * partial + "-" * (10 - dec - partial) + f"] ({self.MP}/{self.MMP})")
+        return render_bar("MP", self.MP, self.MMP)
 
     def recieve_damage(self, damage: int, skill: Skill):
         if skill.type == AttackType.HEAL:
@@ -80,38 +148,78 @@ class Character(ABC):
 
 
 class PlayableCharacter(Character):
-    def __init__(self, name, HP, MP, ATK, MAG, DEF, RES):
-        super().__init__(name, HP, MP, ATK, MAG, DEF, RES)
+    __slots__ = ("policy",)
+
+    def __init__(self, name, HP, MP, ATK, MAG, DEF, RES, SPD=10, policy=None):
+        super().__init__(name, HP, MP, ATK, MAG, DEF, RES, SPD)
         self.behavior = Behavior.PLAYABLE
+        self.policy = policy if policy is not None else HumanPolicy()
     
     def pick_target(self, targets: list[Character]) -> Character:
-        option = choose_option(len(targets))
-        if option == len(targets):
-            return None
-        else:
-            return targets[option]
+        return self.policy.pick_target(self, targets)
 
-    def choose_action(self) -> Skill:
-        option = choose_option(len(self.skills))
-        if option == len(self.skills):
-            return None
-        else:
-            return self.skills[option]
+    def confirm_targets(self, targets: list[Character]) -> bool:
+        return self.policy.confirm_targets(self, targets)
+
+    def choose_action(self, allies: list, enemies: list) -> Skill:
+        return self.policy.choose_action(self, allies, enemies)
 
 class EnemyCharacter(Character):
-    def __init__(self, name, HP, MP, ATK, MAG, DEF, RES):
-        super().__init__(name, HP, MP, ATK, MAG, DEF, RES)
+    __slots__ = ("template",)
+
+    def __init__(self, name, HP, MP, ATK, MAG, DEF, RES, SPD=10):
+        super().__init__(name, HP, MP, ATK, MAG, DEF, RES, SPD)
         self.behavior = Behavior.BASIC
+        # Set by the factories, which take pooled enemies back once their room is over
+        self.template = None
+
+    def release(self):
+        if self.template is not None:
+            ENEMY_POOL.release((type(self), self.template), self)
     
     def pick_target(self, targets: list[Character]) -> Character:
-        return random.choice(targets)
+        return rng.choice(targets)
+
+    def confirm_targets(self, targets: list[Character]) -> bool:
+        return True
     
-    def choose_action(self) -> Skill:
+    def choose_action(self, allies: list, enemies: list) -> Skill:
         usable = []
         for skill in self.skills:
             if skill.cost <= self.MP:
                 usable.append(skill)
-        return random.choice(usable)
+        return rng.choice(usable)
+
+
+# Searches a few turns ahead with the shared planner instead of picking at random
+class PlannerEnemy(EnemyCharacter):
+    __slots__ = ("planner", "planned", "target")
+
+    def __init__(self, name, HP, MP, ATK, MAG, DEF, RES, SPD=10, planner=None):
+        super().__init__(name, HP, MP, ATK, MAG, DEF, RES, SPD)
+        self.behavior = Behavior.PLANNER
+        self.planner = planner if planner is not None else PLANNER
+        self.planned = None
+        self.target = None
+
+    def reset(self, template, name=None):
+        self.planned = None
+        self.target = None
+        return super().reset(template, name)
+
+    def plan(self, allies: list, enemies: list, upcoming: list):
+        self.planned, self.target = self.planner.choose(self, allies, enemies, upcoming)
+
+    def pick_target(self, targets: list[Character]) -> Character:
+        if self.target in targets:
+            return self.target
+        return super().pick_target(targets)
+
+    def choose_action(self, allies: list, enemies: list) -> Skill:
+        if self.planned is None:
+            return super().choose_action(allies, enemies)
+        skill, self.planned = self.planned, None
+        return skill
 
 
 # Character factories
@@ -121,75 +229,113 @@ class CharacterFactory(ABC):
         pass
 
 class MainCharacterFactory(CharacterFactory):
-    def create_character(self, name):
-        player = PlayableCharacter(name= name,HP=30, MP=20, ATK=6, MAG=5, DEF=5, RES=4)
-        player.learn_skill(DamageSkill(name="Swing", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 2, die= 6, dice= 1), cost=0))
-        player.learn_skill(DamageSkill(name="Fire I", description="Magical attack, 1 foe", attack_type=AttackType.MAGICAL, target_strategy=EnemyObjective(), use_strategy=MagicalAttack(power=6, die=6, dice=1), cost=5))
-        player.learn_skill(DamageSkill(name="Heal I", description="Restores HP, 1 ally", attack_type=AttackType.HEAL, target_strategy=AlliedObjective(), use_strategy=MagicalHeal(power=4, die=6, dice=1), cost=5))
-        return player
+    # equipment is a list of catalog modifier ids worn from the start
+    def create_character(self, name, policy=None, equipment=()):
+        character = CATALOG.hero.create(PlayableCharacter, name, policy=policy)
+        for modifier_id in equipment:
+            character.add_modifier(CATALOG.modifiers[modifier_id])
+        return character
 
 class TravelerFactory(CharacterFactory):
-    def create_character(self, name):
-        option = random.randint(1, 5)
-        match option:
-            case 1: # Warrior
-                traveler = PlayableCharacter(name=name, HP=50, MP=10, ATK=8, MAG=3, DEF=6, RES=3)
-                traveler.learn_skill(DamageSkill(name="Swing", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 2, die= 6, dice= 1), cost=0))
-                traveler.learn_skill(DamageSkill(name="Axe-dive", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 4, die= 6, dice= 1), cost=2))
-                traveler.learn_skill(DamageSkill(name="Cross slash", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 2, die= 6, dice= 2), cost=2))
-            case 2: # Mage
-                traveler = PlayableCharacter(name=name, HP=20, MP=40, ATK=2, MAG=8, DEF=4, RES=6)
-                traveler.learn_skill(DamageSkill(name="Mi-Fire", description="Magical attack, 1 foe", attack_type= AttackType.MAGICAL, target_strategy= EnemyObjective(), use_strategy= MagicalAttack(power= 1, die= 6, dice= 1), cost=0))
-                traveler.learn_skill(DamageSkill(name="Fire I", description="Magical attack, 1 foe", attack_type=AttackType.MAGICAL, target_strategy=EnemyObjective(), use_strategy=MagicalAttack(power=6, die=6, dice=1), cost=5))
-                traveler.learn_skill(DamageSkill(name="Al-Fire I", description="Magical attack, all foes", attack_type=AttackType.MAGICAL, target_strategy=AllEnemyObjective(), use_strategy=MagicalAttack(power=6, die=6, dice=1), cost=10))
-            case 3: # Assassin
-                traveler = PlayableCharacter(name=name, HP=40, MP=20, ATK=6, MAG=5, DEF=5, RES=4)
-                traveler.learn_skill(DamageSkill(name="Stab", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 2, die= 4, dice= 2), cost=0))
-                traveler.learn_skill(DamageSkill(name="Al-Thunder I", description="Magical attack, all foes", attack_type=AttackType.MAGICAL, target_strategy=AllEnemyObjective(), use_strategy=MagicalAttack(power=6, die=6, dice=1), cost=10))
-                traveler.learn_skill(DamageSkill(name="Close combat", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 2, die= 20, dice= 1), cost=4))
-            case 4: # Healer
-                traveler = PlayableCharacter(name=name, HP=25, MP=35, ATK=1, MAG=8, DEF=5, RES=6)
-                traveler.learn_skill(DamageSkill(name="Mi-Wind", description="Magical attack, 1 foe", attack_type= AttackType.MAGICAL, target_strategy= EnemyObjective(), use_strategy= MagicalAttack(power= 1, die= 6, dice= 1), cost=0))
-                traveler.learn_skill(HealingSkill(name="Heal I", description="Restores HP, 1 ally", attack_type=AttackType.HEAL, target_strategy=AlliedObjective(), use_strategy=MagicalHeal(power=4, die=6, dice=1), cost=5))
-                traveler.learn_skill(HealingSkill(name="Al-Heal I", description="Restores HP, party", attack_type=AttackType.HEAL, target_strategy=AllAlliedObjective(), use_strategy=MagicalHeal(power=4, die=6, dice=1), cost=10))
-            case 5: # AoE
-                traveler = PlayableCharacter(name=name, HP=20, MP=40, ATK=4, MAG=6, DEF=5, RES=5)
-                traveler.learn_skill(DamageSkill(name="Arrow", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 1, die= 12, dice= 1), cost=0))
-                traveler.learn_skill(DamageSkill(name="Arrow rain", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= AllEnemyObjective(), use_strategy= PhysicalAttack(power= 2, die= 10, dice= 1), cost=4))
-                traveler.learn_skill(DamageSkill(name="Al-Blizzard I", description="Magical attack, all foes", attack_type=AttackType.MAGICAL, target_strategy=AllEnemyObjective(), use_strategy=MagicalAttack(power=6, die=6, dice=1), cost=10))
-        return traveler
+    def create_character(self, name, policy=None):
+        return rng.choice(CATALOG.travelers).create(PlayableCharacter, name, policy=policy)
 
 class MimicFactory(CharacterFactory):
     def create_character(self, name):
-        mimic = EnemyCharacter(name= name + " mimic", HP=30, MP=0, ATK=4, MAG=2, DEF=4, RES=5)
-        mimic.learn_skill(DamageSkill(name="Bite", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 2, die= 6, dice= 1), cost=0))
-        mimic.learn_skill(DamageSkill(name="Tackle", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 2, die= 6, dice= 1), cost=0))
-        return mimic
+        return pooled_enemy(EnemyCharacter, CATALOG.mimic, name + " mimic")
 
 class EnemyFactory(CharacterFactory):
-    def create_character(self, name):
-        match random.randint(1, 4):
-            case 1: # Slime
-                enemy = EnemyCharacter(name="Slime", HP=15, MP=0, ATK=3, MAG=1, DEF=3, RES=4)
-                enemy.learn_skill(DamageSkill(name="Tackle", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 2, die= 6, dice= 1), cost=0))
-            case 2: # Goblin
-                enemy = EnemyCharacter(name="Goblin", HP=25, MP=10, ATK=5, MAG=1, DEF=5, RES=2)
-                enemy.learn_skill(DamageSkill(name="Pierce", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 2, die= 6, dice= 1), cost=0))
-                enemy.learn_skill(DamageSkill(name="Spear-dive", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 4, die= 6, dice= 1), cost=2))
-            case 3: # Orc
-                enemy = EnemyCharacter(name="Orc", HP=40, MP=10, ATK=3, MAG=1, DEF=3, RES=4)
-                enemy.learn_skill(DamageSkill(name="Smash", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 2, die= 6, dice= 1), cost=0))
-                enemy.learn_skill(DamageSkill(name="Cross slash", description="Physical attack, 1 foe", attack_type= AttackType.PHYSICAL, target_strategy= EnemyObjective(), use_strategy= PhysicalAttack(power= 2, die= 6, dice= 2), cost=2))
-            case 4: # Wizard
-                enemy = EnemyCharacter(name="Wizard", HP=20, MP=20, ATK=1, MAG=6, DEF=2, RES=5)
-                enemy.learn_skill(DamageSkill(name="Mi-Wind", description="Magical attack, 1 foe", attack_type= AttackType.MAGICAL, target_strategy= EnemyObjective(), use_strategy= MagicalAttack(power= 1, die= 6, dice= 1), cost=0))
-                enemy.learn_skill(DamageSkill(name="Thunder I", description="Magical attack, 1 foe", attack_type=AttackType.MAGICAL, target_strategy=EnemyObjective(), use_strategy=MagicalAttack(power=6, die=6, dice=1), cost=5))
-        return enemy
+    def create_character(self, name, depth=0, rng=rng):
+        template = CATALOG.enemy_spawns.sample(depth, rng)
+        if depth >= CATALOG.planner["from_room"]:
+            return pooled_enemy(PlannerEnemy, template)
+        return pooled_enemy(EnemyCharacter, template)
 
 
+def pooled_enemy(character_class, template, name=None):
+    character = ENEMY_POOL.acquire((character_class, template))
+    if character is None:
+        character = template.create(character_class, name)
+    else:
+        character.reset(template, name)
+    character.template = template
+    return character
+
+
+# Wraps a character and forwards everything to it, reads and writes alike; override what
+# should behave differently. Stat changes belong in modifiers, which stay a flat lookup
+# however many are active.
 class CharacterDecorator(Character):
+    __slots__ = ("character",)
+
     def __init__(self, character: Character):
-        self.character = character
+        object.__setattr__(self, "character", character)
+
+    def __getattr__(self, name):
+        return getattr(self.character, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.character, name, value)
     
     def get_ATK(self):
-        return self.character.get_ATK()
\ No newline at end of file
+        return self.character.get_ATK()
+    def get_DEF(self):
+        return self.character.get_DEF()
+    def get_MAG(self):
+        return self.character.get_MAG()
+    def get_RES(self):
+        return self.character.get_RES()
+    def get_SPD(self):
+        return self.character.get_SPD()
+
+    def choose_action(self, allies: list, enemies: list) -> Skill:
+        return self.character.choose_action(allies, enemies)
+
+    def pick_target(self, targets):
+        return self.character.pick_target(targets)
+
+    def confirm_targets(self, targets) -> bool:
+        return self.character.confirm_targets(targets)
+
+    def reset(self, template, name=None):
+        self.character.reset(template, name)
+        return self
+
+    def check_MP(self, cost: int) -> bool:
+        return self.character.check_MP(cost)
+
+    def learn_skill(self, skill: Skill):
+        self.character.learn_skill(skill)
+
+    def change_HP(self, ammount: int):
+        self.character.change_HP(ammount)
+
+    def change_MP(self, ammount: int):
+        self.character.change_MP(ammount)
+
+    def health_bar(self) -> str:
+        return self.character.health_bar()
+
+    def mana_bar(self) -> str:
+        return self.character.mana_bar()
+
+    def recieve_damage(self, damage: int, skill: Skill):
+        self.character.recieve_damage(damage, skill)
+
+    def set_modifiers(self, modifiers: tuple):
+        self.character.set_modifiers(modifiers)
+
+    def load_modifiers(self, modifiers: tuple):
+        self.character.load_modifiers(modifiers)
+
+    def add_modifier(self, modifier):
+        self.character.add_modifier(modifier)
+
+    def remove_modifier(self, modifier):
+        self.character.remove_modifier(modifier)
+
+    def tick(self):
+        self.character.tick()
+
+    def clear_timed(self):
+        self.character.clear_timed()
\ No newline at end of file
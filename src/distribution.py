@@ -0,0 +1,76 @@
+from functools import lru_cache
+
+CRIT_CHANCE = 1 / 20
+FAIL_CHANCE = 1 / 20
+
+
+# Exact probability mass function of the damage (or healing) of one use
+class DamageDistribution:
+    def __init__(self, pmf: dict):
+        self.pmf = [0.0] * (max(pmf) + 1)
+        for value, chance in pmf.items():
+            self.pmf[value] += chance
+        self.mean = sum(value * chance for value, chance in pmf.items())
+        # tail[h] is the chance of dealing at least h
+        self.tail = [0.0] * (len(self.pmf) + 1)
+        for value in range(len(self.pmf) - 1, -1, -1):
+            self.tail[value] = self.tail[value + 1] + self.pmf[value]
+        # total[h] is the sum of value * chance over every value below h
+        self.total = [0.0] * (len(self.pmf) + 1)
+        for value, chance in enumerate(self.pmf):
+            self.total[value + 1] = self.total[value] + value * chance
+
+    def probability(self, value: int) -> float:
+        if 0 <= value < len(self.pmf):
+            return self.pmf[value]
+        return 0.0
+
+    # Mean of the outcomes that leave a target with this much HP alive
+    def mean_below(self, HP: int) -> float:
+        HP = min(HP, len(self.pmf))
+        survive = 1 - self.tail[HP]
+        if HP <= 0 or survive <= 0:
+            return 0.0
+        return self.total[HP] / survive
+
+    def kill_chance(self, HP: int) -> float:
+        if HP <= 0:
+            return 1.0
+        if HP >= len(self.tail):
+            return 0.0
+        return self.tail[HP]
+
+
+@lru_cache(maxsize=None)
+def dice_pmf(sides: int, dice: int) -> dict:
+    pmf = {0: 1.0}
+    for _ in range(dice):
+        rolled = {}
+        for total, chance in pmf.items():
+            for face in range(1, sides + 1):
+                rolled[total + face] = rolled.get(total + face, 0.0) + chance / sides
+        pmf = rolled
+    return pmf
+
+
+@lru_cache(maxsize=None)
+def damage_table(power: int, die: int, dice: int, delta: int, clamp: bool, critical: bool) -> DamageDistribution:
+    base = {}
+    for roll, chance in dice_pmf(die, dice).items():
+        value = power + roll + delta
+        if clamp:
+            value = max(1, value)
+        value = max(0, value)
+        base[value] = base.get(value, 0.0) + chance
+    if not critical:
+        return DamageDistribution(base)
+    pmf = {0: FAIL_CHANCE}
+    for value, chance in base.items():
+        pmf[value] = pmf.get(value, 0.0) + chance * (1 - CRIT_CHANCE - FAIL_CHANCE)
+        pmf[value * 2] = pmf.get(value * 2, 0.0) + chance * CRIT_CHANCE
+    return DamageDistribution(pmf)
+
+
+def distribution(skill, delta: int) -> DamageDistribution:
+    attack = skill.use_strategy
+    return damage_table(attack.power, attack.die, attack.dice, delta, attack.clamp, skill.critical)
\ No newline at end of file
@@ -3,6 +3,7 @@ from enum import Enum
 class Behavior(Enum):
     PLAYABLE = 1
     BASIC = 2
+    PLANNER = 3
 
 class AttackType(Enum):
     PHYSICAL = 1
@@ -14,6 +15,11 @@ class HitType(Enum):
     FAILED = 2
     CRIT = 3
 
+class LogLevel(Enum):
+    DEBUG = 1
+    INFO = 2
+    WARNING = 3
+
 class Element(Enum):
     HEAL = 1
     PHYSICAL = 2
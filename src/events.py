@@ -0,0 +1,185 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+import argparse
+import json
+import mmap
+import os
+import sys
+from array import array
+from collections import Counter
+from .enumeration import AttackType, HitType
+from .battle import Battle
+from .room import Room
+
+# Column name and array typecode; strings are stored as ids into the names table
+COLUMNS = (
+    ("run", "I"),
+    ("room", "I"),
+    ("kind", "B"),
+    ("actor", "H"),
+    ("skill", "H"),
+    ("target", "H"),
+    ("roll", "B"),
+    ("damage", "i"),
+    ("hit", "B"),
+    ("hp", "i"),
+)
+# Values of the kind column. Room events name the room class as actor; heals are kept
+# apart from hits since their damage column is the HP restored. Rolls are 0 for skills
+# that do not roll and hit is 0 outside hits and heals (HitType values start at 1).
+ROOM, HIT, DEATH, HEAL = 0, 1, 2, 3
+KINDS = ("room", "hit", "death", "heal")
+
+
+# Buffers events in typed columns and appends them to one file per column every `chunk`
+# events. The schema file is rewritten on every flush, so what is on disk can always be read.
+class ColumnWriter:
+    def __init__(self, path: str, chunk: int = 65536):
+        self.path = path
+        self.chunk = chunk
+        self.columns = {name: array(code) for name, code in COLUMNS}
+        self.names = []
+        self.ids = {}
+        self.pending = 0
+        os.makedirs(path, exist_ok=True)
+        for name, _ in COLUMNS:
+            open(os.path.join(path, f"{name}.bin"), "wb").close()
+
+    def name_id(self, name: str) -> int:
+        index = self.ids.get(name)
+        if index is None:
+            index = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def append(self, run: int, room: int, kind: int, actor: str, skill: str = "", target: str = "", roll: int = 0, damage: int = 0, hit: int = 0, hp: int = 0):
+        values = (run, room, kind, self.name_id(actor), self.name_id(skill), self.name_id(target), roll, damage, hit, hp)
+        for (name, _), value in zip(COLUMNS, values):
+            self.columns[name].append(value)
+        self.pending += 1
+        if self.pending >= self.chunk:
+            self.flush()
+
+    def flush(self):
+        for name, column in self.columns.items():
+            with open(os.path.join(self.path, f"{name}.bin"), "ab") as file:
+                column.tofile(file)
+            del column[:]
+        self.pending = 0
+        schema = {"byteorder": sys.byteorder, "columns": COLUMNS, "kinds": KINDS, "names": self.names}
+        with open(os.path.join(self.path, "schema.json"), "w", encoding="utf-8") as file:
+            json.dump(schema, file)
+
+    def close(self):
+        self.flush()
+
+
+# Turns battle and room notifications into events for one writer
+class EventRecorder:
+    def __init__(self, writer: ColumnWriter):
+        self.writer = writer
+        self.run = 0
+        self.room = 0
+
+    def attach(self):
+        Battle.listeners.append(self)
+        Room.listeners.append(self)
+
+    def detach(self):
+        Battle.listeners.remove(self)
+        Room.listeners.remove(self)
+
+    def start_run(self, run: int):
+        self.run = run
+        self.room = 0
+
+    def on_room(self, room):
+        self.room += 1
+        self.writer.append(self.run, self.room, ROOM, type(room).__name__)
+
+    def on_hit(self, user, target, skill, result: dict):
+        kind = HEAL if skill.type == AttackType.HEAL else HIT
+        self.writer.append(self.run, self.room, kind, user.name, skill.name, target.name, result.get("roll", 0),
+                           result["damage"], result["hit"].value, target.HP)
+
+    def on_death(self, character, killer):
+        self.writer.append(self.run, self.room, DEATH, killer.name, "", character.name, hp=character.HP)
+
+    def on_finish(self, battle):
+        pass
+
+
+# Columns of one written directory, mapped rather than read: column() is a memoryview
+# over the file and numpy() an array over the same memory, neither copies the data
+class EventColumns:
+    def __init__(self, path: str):
+        with open(os.path.join(path, "schema.json"), encoding="utf-8") as file:
+            schema = json.load(file)
+        if schema["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {schema['byteorder']} endian machine")
+        self.names = schema["names"]
+        self.codes = dict(schema["columns"])
+        self.maps = {}
+        for name in self.codes:
+            with open(os.path.join(path, f"{name}.bin"), "rb") as file:
+                size = os.fstat(file.fileno()).st_size
+                self.maps[name] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self.column("run"))
+
+    def column(self, name: str) -> memoryview:
+        return memoryview(self.maps[name]).cast(self.codes[name])
+
+    def numpy(self, name: str):
+        if np is None:
+            raise ImportError("EventColumns.numpy needs numpy installed")
+        return np.frombuffer(self.maps[name], dtype=np.dtype(self.codes[name]))
+
+    def close(self):
+        for mapped in self.maps.values():
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+
+# A directory written by ColumnWriter, or a directory of them such as the parts of farm --events
+def open_events(path: str) -> list:
+    if os.path.exists(os.path.join(path, "schema.json")):
+        return [EventColumns(path)]
+    return [EventColumns(os.path.join(path, part)) for part in sorted(os.listdir(path))
+            if os.path.exists(os.path.join(path, part, "schema.json"))]
+
+
+# Events per kind, then per skill the mean damage of the hits that landed (misses are
+# left out, as in stats) and the mean HP restored by heals, scanning the mapped columns
+def summarize(parts: list) -> dict:
+    events = Counter()
+    totals = {HIT: Counter(), HEAL: Counter()}
+    counts = {HIT: Counter(), HEAL: Counter()}
+    for part in parts:
+        kinds, skills, amounts, results = part.column("kind"), part.column("skill"), part.column("damage"), part.column("hit")
+        for index in range(len(kinds)):
+            kind = kinds[index]
+            events[KINDS[kind]] += 1
+            if kind in totals and results[index] != HitType.FAILED.value:
+                skill = part.names[skills[index]]
+                counts[kind][skill] += 1
+                totals[kind][skill] += amounts[index]
+    means = {kind: {skill: totals[kind][skill] / counts[kind][skill] for skill in sorted(counts[kind])} for kind in totals}
+    return {
+        "events": dict(events),
+        "mean_damage": means[HIT],
+        "mean_healing": means[HEAL],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize battle events written by farm --events")
+    parser.add_argument("path")
+    args = parser.parse_args()
+    parts = open_events(args.path)
+    print(json.dumps(summarize(parts), indent=2))
+    for part in parts:
+        part.close()
\ No newline at end of file
@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+from collections import Counter
+from multiprocessing import Pool
+from .functions import rng
+from .policy import GreedyPolicy, RandomPolicy
+from .character import MainCharacterFactory, PLANNER
+from .catalog import CATALOG
+from .room import Dungeon
+from .simulation import headless
+from .profiler import Profiler
+from .battle import Battle
+from .stats import RunStats
+from .events import ColumnWriter, EventRecorder
+from .printer import Printer
+
+POLICIES = {"greedy": GreedyPolicy, "random": RandomPolicy}
+# Modifiers the hero can start the run wearing
+EQUIPMENT = sorted(modifier_id for modifier_id, modifier in CATALOG.modifiers.items() if not modifier.timed)
+
+
+class RunSummary:
+    def __init__(self):
+        self.runs = 0
+        self.capped = 0
+        self.rooms = Counter()
+        self.deaths = Counter()
+        self.battles = Counter()
+        self.profile = None
+        self.stats = None
+
+    def add_battle(self, battle):
+        self.battles[battle.turns] += 1
+
+    def add_run(self, dungeon: Dungeon):
+        self.runs += 1
+        self.rooms[dungeon.current] += 1
+        if len(dungeon.party) > 0:
+            self.capped += 1
+        else:
+            self.deaths[type(dungeon.room).__name__] += 1
+        if self.stats is not None:
+            self.stats.add_run(dungeon)
+
+    def merge(self, other: "RunSummary"):
+        self.runs += other.runs
+        self.capped += other.capped
+        self.rooms.update(other.rooms)
+        self.deaths.update(other.deaths)
+        self.battles.update(other.battles)
+        if other.profile is not None:
+            self.profile = other.profile if self.profile is None else self.profile.merge(other.profile)
+        if other.stats is not None:
+            self.stats = other.stats if self.stats is None else self.stats.merge(other.stats)
+        return self
+
+    def report(self) -> dict:
+        rooms = sum(depth * runs for depth, runs in self.rooms.items())
+        battles = sum(self.battles.values())
+        turns = sum(length * count for length, count in self.battles.items())
+        return {
+            "runs": self.runs,
+            "capped": self.capped,
+            "mean_rooms": rooms / self.runs if self.runs else 0,
+            "max_rooms": max(self.rooms, default=0),
+            "rooms": dict(sorted(self.rooms.items())),
+            "deaths": dict(self.deaths),
+            "battles": battles,
+            "mean_battle_turns": turns / battles if battles else 0,
+            "battle_turns": dict(sorted(self.battles.items())),
+        }
+
+
+# Each run gets its own stream and planner table, so results do not depend on the worker that ran it
+def seed_run(seed: int, index: int):
+    rng.seed(f"{seed}:{index}")
+    PLANNER.reset()
+
+
+def play_run(summary: RunSummary, policy_name: str, max_rooms: int, equipment=()):
+    player = MainCharacterFactory().create_character("Hero", policy=POLICIES[policy_name](), equipment=equipment)
+    dungeon = Dungeon([player])
+    while len(dungeon.party) > 0 and dungeon.current < max_rooms:
+        room = dungeon.step()
+        if room.battle is not None:
+            summary.add_battle(room.battle)
+    summary.add_run(dungeon)
+
+
+def run_chunk(task: tuple) -> RunSummary:
+    seed, start, stop, policy_name, max_rooms, profile, stats, events, log, equipment = task
+    summary = RunSummary()
+    if profile:
+        summary.profile = Profiler.enable()
+    if stats:
+        summary.stats = RunStats()
+        Battle.listeners.append(summary.stats)
+    # Every chunk writes its own part, so workers never share a file
+    recorder = None
+    if events:
+        recorder = EventRecorder(ColumnWriter(os.path.join(events, f"part-{start:08d}")))
+        recorder.attach()
+    if log:
+        os.makedirs(log, exist_ok=True)
+        Printer.log.open_sink(os.path.join(log, f"part-{start:08d}.log"))
+    try:
+        for index in range(start, stop):
+            seed_run(seed, index)
+            if recorder is not None:
+                recorder.start_run(index)
+            play_run(summary, policy_name, max_rooms, equipment)
+    finally:
+        if profile:
+            Profiler.disable()
+        if stats:
+            Battle.listeners.remove(summary.stats)
+        if recorder is not None:
+            recorder.detach()
+            recorder.writer.close()
+        if log:
+            Printer.log.close_sink()
+    return summary
+
+
+def farm(runs: int, workers=None, seed=0, policy="greedy", max_rooms=500, chunk=50, profile=False, stats=False, events=None, log=None, equipment=()) -> RunSummary:
+    workers = workers or os.cpu_count()
+    tasks = [(seed, start, min(start + chunk, runs), policy, max_rooms, profile, stats, events, log, tuple(equipment)) for start in range(0, runs, chunk)]
+    summary = RunSummary()
+    if workers == 1:
+        headless()
+        for task in tasks:
+            summary.merge(run_chunk(task))
+        return summary
+    with Pool(processes=workers, initializer=headless) as pool:
+        for partial in pool.imap_unordered(run_chunk, tasks):
+            summary.merge(partial)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many headless tower runs in parallel")
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    parser.add_argument("--max-rooms", type=int, default=500)
+    parser.add_argument("--chunk", type=int, default=50)
+    parser.add_argument("--profile", metavar="FILE", help="write phase timings and event counts (.prom for Prometheus, JSON otherwise)")
+    parser.add_argument("--stats", metavar="FILE", help="write quantiles and histograms of rooms, battle turns and damage per skill as JSON")
+    parser.add_argument("--events", metavar="DIR", help="write every room, hit and death as memory-mappable columns, one part per chunk")
+    parser.add_argument("--log", metavar="DIR", help="write the log of every run in batches, one file per chunk")
+    parser.add_argument("--equip", nargs="*", choices=EQUIPMENT, default=(), help="equipment the hero starts with")
+    args = parser.parse_args()
+    summary = farm(args.runs, args.workers, args.seed, args.policy, args.max_rooms, args.chunk, args.profile is not None, args.stats is not None, args.events, args.log, args.equip)
+    print(json.dumps(summary.report(), indent=2))
+    if args.profile:
+        summary.profile.export(args.profile)
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as file:
+            json.dump(summary.stats.report(), file, indent=2)
\ No newline at end of file
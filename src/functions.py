@@ -1,9 +1,12 @@
 import random
 
+# Shared random stream, reseed it to reproduce a run
+rng = random.Random()
+
 def dice_roll(sides, dice) -> int:
     total = 0
     for i in range(dice):
-        total += random.randint(1, sides)
+        total += rng.randint(1, sides)
     return total
 
 def wait_button() -> None:
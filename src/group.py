@@ -0,0 +1,49 @@
+# Combatants of one side with O(1) membership and removal, for large battles.
+# Removal swaps the last member into the gap, so order is not preserved. A list
+# removal grows with the side and only dominates a turn past a few thousand
+# combatants or when many die at once (benchmarks/horde.py measures both).
+class Group:
+    __slots__ = ("members", "positions")
+
+    def __init__(self, members=()):
+        self.members = []
+        self.positions = {}
+        for member in members:
+            self.append(member)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __getitem__(self, index: int):
+        return self.members[index]
+
+    def __contains__(self, member) -> bool:
+        return member in self.positions
+
+    # Iterates over a snapshot, members can be removed meanwhile
+    def __iter__(self):
+        return iter(tuple(self.members))
+
+    def append(self, member):
+        self.positions[member] = len(self.members)
+        self.members.append(member)
+
+    def remove(self, member):
+        index = self.positions.pop(member)
+        last = self.members.pop()
+        if last is not member:
+            self.members[index] = last
+            self.positions[last] = index
+
+    # Undoes remove: the member goes back to its index and the one there moves to the end
+    def insert(self, index: int, member):
+        if index == len(self.members):
+            self.append(member)
+            return
+        moved = self.members[index]
+        self.members[index] = member
+        self.positions[member] = index
+        self.append(moved)
+
+    def index(self, member) -> int:
+        return self.positions[member]
\ No newline at end of file
@@ -0,0 +1,20 @@
+# Undo log for exploring a battle: every change records how to revert itself,
+# so rolling back costs as much as the changes made since the checkpoint
+class Journal:
+    # Journal of the battle whose step is running, written to by characters and the log
+    active = None
+
+    def __init__(self):
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def record(self, undo, *args):
+        self.entries.append((undo, args))
+
+    def rollback(self, size: int):
+        entries = self.entries
+        while len(entries) > size:
+            undo, args = entries.pop()
+            undo(*args)
\ No newline at end of file
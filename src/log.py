@@ -0,0 +1,62 @@
+import atexit
+from collections import deque
+from .enumeration import LogLevel
+from .journal import Journal
+
+
+# Keeps the latest entries in a ring buffer and streams every entry to an optional file in batches
+class Log:
+    def __init__(self, capacity: int = 200, level: LogLevel = LogLevel.DEBUG, batch: int = 256):
+        self.entries = deque(maxlen=capacity)
+        self.level = level
+        self.batch = batch
+        self.path = None
+        self.pending = []
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, message: str, level: LogLevel = LogLevel.INFO):
+        if level.value < self.level.value:
+            return
+        if Journal.active is not None:
+            evicted = self.entries[0] if len(self.entries) == self.entries.maxlen else None
+            Journal.active.record(self.retract, evicted, len(self.pending))
+        self.entries.append(message)
+        if self.path is not None:
+            self.pending.append(f"{level.name} {message}")
+            if len(self.pending) >= self.batch:
+                self.flush()
+
+    # Undoes add; lines already written to the sink stay there
+    def retract(self, evicted, pending: int):
+        self.entries.pop()
+        if evicted is not None:
+            self.entries.appendleft(evicted)
+        del self.pending[pending:]
+
+    def open_sink(self, path: str):
+        self.flush()
+        if self.path is None:
+            atexit.register(self.flush)
+        self.path = path
+
+    def close_sink(self):
+        self.flush()
+        self.path = None
+
+    def flush(self):
+        if self.path is None or not self.pending:
+            return
+        with open(self.path, "a", encoding="utf-8") as sink:
+            sink.write("\n".join(self.pending) + "\n")
+        self.pending.clear()
+
+    def clear(self):
+        self.entries.clear()
+
+    def render(self) -> str:
+        return "\n".join(self.entries)
\ No newline at end of file
@@ -0,0 +1,33 @@
+# Stats that modifiers can change
+STATS = ("ATK", "MAG", "DEF", "RES", "SPD")
+
+
+# A named stat change in flat points and percent. Timed ones last a number of the
+# bearer's turns, the rest (equipment) stay until removed.
+class Modifier:
+    __slots__ = ("name", "flat", "percent", "turns")
+
+    def __init__(self, name: str, flat=None, percent=None, turns=None):
+        self.name = name
+        self.flat = dict(flat or {})
+        self.percent = dict(percent or {})
+        self.turns = turns
+
+    @property
+    def timed(self) -> bool:
+        return self.turns is not None
+
+
+# Effective stats with every active modifier folded in, rebuilt only when they change
+class StatBlock:
+    __slots__ = STATS
+
+    def __init__(self, character, effects: tuple):
+        for stat in STATS:
+            flat = 0
+            percent = 100
+            for modifier, _ in effects:
+                flat += modifier.flat.get(stat, 0)
+                percent += modifier.percent.get(stat, 0)
+            value = (getattr(character, stat) + flat) * percent // 100
+            setattr(self, stat, max(1 if stat == "SPD" else 0, value))
\ No newline at end of file
@@ -0,0 +1,204 @@
+import time
+from collections import OrderedDict
+from .enumeration import AttackType, Behavior
+from .skill import AlliedObjective, AllAlliedObjective, SelfObjective
+
+WIN = 1000.0
+
+
+# Raised inside the search once the decision runs out of time or nodes
+class OutOfBudget(Exception):
+    pass
+
+
+# Expectiminimax over the coming turns: the planner's side maximises, the other side
+# minimises and every hit is a chance node (kill or survive with the conditional mean).
+# Iterative deepening keeps the best move of the last finished depth.
+class Planner:
+    def __init__(self, budget: float = 0.002, nodes: int = 60, max_depth: int = 8, table_size: int = 100000):
+        self.budget = budget
+        self.nodes = nodes
+        self.max_depth = max_depth
+        self.table_size = table_size
+        self.table = OrderedDict()
+        # Deterministic planners only count nodes, so recorded runs replay the same
+        self.deterministic = False
+
+    def clear(self):
+        self.table.clear()
+
+    # New limits, for instance from another catalog; the table was filled under the old ones
+    def configure(self, budget: float, nodes: int, max_depth: int, table_size: int):
+        self.budget = budget
+        self.nodes = nodes
+        self.max_depth = max_depth
+        self.table_size = table_size
+        self.clear()
+
+    # Node budget only and an empty table, so a seeded run always plays the same
+    def reset(self, deterministic: bool = True):
+        self.deterministic = deterministic
+        self.clear()
+
+    def lookup(self, key):
+        value = self.table.get(key)
+        if value is not None:
+            self.table.move_to_end(key)
+        return value
+
+    def store(self, key, value: tuple):
+        self.table[key] = value
+        if len(self.table) > self.table_size:
+            self.table.popitem(last=False)
+
+    # Returns the (skill, target) pair to play; target is None for area and self skills
+    def choose(self, actor, allies: list, enemies: list, upcoming: list) -> tuple:
+        search = Search(self, actor, allies, enemies, upcoming)
+        best = search.root(1)
+        for depth in range(2, self.max_depth + 1):
+            try:
+                best = search.root(depth)
+            except OutOfBudget:
+                break
+            if not search.cutoff:
+                break
+        skill, target = best
+        return skill, None if target is None else search.characters[target]
+
+
+class Search:
+    def __init__(self, planner: Planner, actor, allies: list, enemies: list, upcoming: list):
+        self.planner = planner
+        self.characters = [*allies, *enemies]
+        slots = {id(character): slot for slot, character in enumerate(self.characters)}
+        self.split = len(allies)
+        self.side = [0] * len(allies) + [1] * len(enemies)
+        self.MHP = [character.MHP for character in self.characters]
+        self.pays = [character.behavior is Behavior.PLAYABLE for character in self.characters]
+        self.sequence = tuple(slots[id(character)] for character in [actor, *upcoming] if id(character) in slots)
+        self.signature = hash((tuple((character.MHP, character.get_ATK(), character.get_MAG(), character.get_DEF(), character.get_RES(),
+                                      tuple(character.skills), side) for character, side in zip(self.characters, self.side)), self.sequence))
+        self.hp = tuple(character.HP for character in self.characters)
+        self.mp = tuple(character.MP for character in self.characters)
+        self.outcomes = {}
+        self.deadline = None if planner.deterministic else time.perf_counter() + planner.budget
+        self.expanded = 0
+        # Set when some line was cut at the depth limit, so searching deeper could still change the answer
+        self.cutoff = False
+
+    def spend(self):
+        self.expanded += 1
+        if self.expanded >= self.planner.nodes:
+            raise OutOfBudget()
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise OutOfBudget()
+
+    # Depth 1 never expands a node, so it always completes
+    def root(self, depth: int) -> tuple:
+        self.cutoff = False
+        best, best_value = None, None
+        for action in self.actions(self.sequence[0], self.hp, self.mp):
+            value = self.expectation(action, self.sequence[0], self.hp, self.mp, 1, depth - 1)
+            if best_value is None or value > best_value:
+                best, best_value = action, value
+        skill, targets = best
+        if skill.target_strategy.area or isinstance(skill.target_strategy, SelfObjective):
+            return skill, None
+        return skill, targets[0]
+
+    def actions(self, slot: int, hp: tuple, mp: tuple) -> list:
+        character = self.characters[slot]
+        side = self.side[slot]
+        actions = []
+        for skill in character.skills:
+            if skill.cost > mp[slot]:
+                continue
+            if isinstance(skill.target_strategy, SelfObjective):
+                actions.append((skill, (slot,)))
+                continue
+            wanted = side if isinstance(skill.target_strategy, (AlliedObjective, AllAlliedObjective)) else 1 - side
+            targets = tuple(other for other in range(len(hp)) if self.side[other] == wanted and hp[other] > 0)
+            if not targets:
+                continue
+            if skill.target_strategy.area:
+                actions.append((skill, targets))
+            else:
+                actions.extend((skill, (target,)) for target in targets)
+        return actions
+
+    # Outcome branches of one hit as (chance, HP after), cached per attacker, skill, target and HP
+    def branches(self, slot: int, skill, target: int, HP: int, area: bool) -> tuple:
+        key = (slot, skill, target, HP, area)
+        branches = self.outcomes.get(key)
+        if branches is None:
+            distribution = skill.distribution(self.characters[slot], self.characters[target])
+            if skill.type == AttackType.HEAL:
+                branches = ((1.0, min(self.MHP[target], HP + round(distribution.mean))),)
+            elif area:
+                branches = ((1.0, max(0, HP - round(distribution.mean))),)
+            else:
+                kill = distribution.kill_chance(HP)
+                branches = ((kill, 0), (1 - kill, max(1, HP - round(distribution.mean_below(HP)))))
+                branches = tuple(branch for branch in branches if branch[0] > 0)
+            self.outcomes[key] = branches
+        return branches
+
+    def expectation(self, action: tuple, slot: int, hp: tuple, mp: tuple, position: int, depth: int) -> float:
+        skill, targets = action
+        if self.pays[slot] and skill.cost:
+            mp = mp[:slot] + (mp[slot] - skill.cost,) + mp[slot + 1:]
+        area = len(targets) > 1
+        states = [(1.0, hp)]
+        for target in targets:
+            resolved = []
+            for chance, state in states:
+                for branch, HP in self.branches(slot, skill, target, state[target], area):
+                    resolved.append((chance * branch, state[:target] + (HP,) + state[target + 1:]))
+            states = resolved
+        return sum(chance * self.value(state, mp, position, depth) for chance, state in states)
+
+    def value(self, hp: tuple, mp: tuple, position: int, depth: int) -> float:
+        while position < len(self.sequence) and hp[self.sequence[position]] <= 0:
+            position += 1
+        if not (any(hp[:self.split]) and any(hp[self.split:])):
+            return self.evaluate(hp)
+        if depth == 0 or position >= len(self.sequence):
+            self.cutoff = True
+            return self.evaluate(hp)
+        key = (self.signature, hp, mp, position, depth)
+        cached = self.planner.lookup(key)
+        if cached is not None:
+            value, cutoff = cached
+            self.cutoff = self.cutoff or cutoff
+            return value
+        self.spend()
+        outer, self.cutoff = self.cutoff, False
+        slot = self.sequence[position]
+        values = [self.expectation(action, slot, hp, mp, position + 1, depth - 1) for action in self.actions(slot, hp, mp)]
+        if not values:
+            value = self.value(hp, mp, position + 1, depth - 1)
+        elif self.side[slot] == 0:
+            value = max(values)
+        else:
+            value = min(values)
+        self.planner.store(key, (value, self.cutoff))
+        self.cutoff = outer or self.cutoff
+        return value
+
+    # HP never goes below 0, so a side is alive while any of its HP is non zero
+    def alive(self, hp: tuple) -> tuple:
+        return any(hp[:self.split]), any(hp[self.split:])
+
+    # Positive when the planner's side is ahead, wins and losses dominate everything else
+    def evaluate(self, hp: tuple) -> float:
+        allies, enemies = self.alive(hp)
+        if not enemies:
+            return WIN
+        if not allies:
+            return -WIN
+        score = 0.0
+        for slot, HP in enumerate(hp):
+            if HP > 0:
+                share = 1 + HP / self.MHP[slot]
+                score += share if slot < self.split else -share
+        return score
\ No newline at end of file
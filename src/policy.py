@@ -0,0 +1,137 @@
+from abc import ABC, abstractmethod
+from .enumeration import AttackType
+from .functions import choose_option, rng
+from .printer import Printer
+
+
+# Decides for a playable character (Strategy)
+class Policy(ABC):
+    @abstractmethod
+    def choose_action(self, character, allies: list, enemies: list):
+        pass
+
+    @abstractmethod
+    def pick_target(self, character, targets: list):
+        pass
+
+    @abstractmethod
+    def confirm_targets(self, character, targets: list) -> bool:
+        pass
+
+    @abstractmethod
+    def yes_no(self, question: str) -> bool:
+        pass
+
+
+# Raised when a scripted policy runs out of recorded choices
+class ScriptExhausted(Exception):
+    pass
+
+
+class HumanPolicy(Policy):
+    def __init__(self, record=None):
+        self.record = record
+
+    def ask(self, options: int) -> int:
+        Printer().flush()
+        option = choose_option(options)
+        if self.record is not None:
+            self.record.append(option)
+        return option
+
+    def choose_action(self, character, allies, enemies):
+        option = self.ask(len(character.skills))
+        if option == len(character.skills):
+            return None
+        return character.skills[option]
+
+    def pick_target(self, character, targets):
+        Printer().choose_character(targets)
+        option = self.ask(len(targets))
+        if option == len(targets):
+            return None
+        return targets[option]
+
+    def confirm_targets(self, character, targets):
+        Printer().choose_all(targets)
+        return self.ask(2) == 0
+
+    def yes_no(self, question):
+        Printer().yes_no_question(question)
+        return self.ask(2) == 0
+
+
+# Replays option indices exactly as a player would type them (0-based)
+class ScriptedPolicy(Policy):
+    def __init__(self, script):
+        self.script = iter(script)
+
+    def next_option(self) -> int:
+        try:
+            return next(self.script)
+        except StopIteration:
+            raise ScriptExhausted() from None
+
+    def choose_action(self, character, allies, enemies):
+        option = self.next_option()
+        if option >= len(character.skills):
+            return None
+        return character.skills[option]
+
+    def pick_target(self, character, targets):
+        option = self.next_option()
+        if option >= len(targets):
+            return None
+        return targets[option]
+
+    def confirm_targets(self, character, targets):
+        return self.next_option() == 0
+
+    def yes_no(self, question):
+        return self.next_option() == 0
+
+
+class RandomPolicy(Policy):
+    def __init__(self, rng=rng):
+        self.rng = rng
+
+    def choose_action(self, character, allies, enemies):
+        usable = [skill for skill in character.skills if skill.cost <= character.MP]
+        return self.rng.choice(usable)
+
+    def pick_target(self, character, targets):
+        return self.rng.choice(targets)
+
+    def confirm_targets(self, character, targets):
+        return True
+
+    def yes_no(self, question):
+        return self.rng.random() < 0.5
+
+
+# Heals a badly hurt ally when possible, otherwise hits as hard as it can
+class GreedyPolicy(Policy):
+    def score(self, skill, enemies: list) -> float:
+        attack = skill.use_strategy
+        mean = attack.power + attack.dice * (attack.die + 1) / 2
+        if skill.target_strategy.area:
+            return mean * len(enemies)
+        return mean
+
+    def choose_action(self, character, allies, enemies):
+        usable = [skill for skill in character.skills if skill.cost <= character.MP]
+        hurt = any(ally.HP * 2 < ally.MHP for ally in allies)
+        heals = [skill for skill in usable if skill.type == AttackType.HEAL]
+        if hurt and heals:
+            return max(heals, key=lambda skill: (self.score(skill, allies), -skill.cost))
+        attacks = [skill for skill in usable if skill.type != AttackType.HEAL]
+        return max(attacks, key=lambda skill: (self.score(skill, enemies), -skill.cost))
+
+    def pick_target(self, character, targets):
+        return min(targets, key=lambda target: target.HP / target.MHP)
+
+    def confirm_targets(self, character, targets):
+        return True
+
+    def yes_no(self, question):
+        return True
\ No newline at end of file
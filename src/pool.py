@@ -0,0 +1,27 @@
+# Free lists of finished objects by key. acquire returns None when there is nothing to
+# reuse and the caller builds a new object; `misses` counts those, so a steady run shows
+# it stop growing.
+class Pool:
+    def __init__(self, limit: int = 64):
+        self.limit = limit
+        self.free = {}
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, key):
+        free = self.free.get(key)
+        if free:
+            self.hits += 1
+            return free.pop()
+        self.misses += 1
+        return None
+
+    def release(self, key, item):
+        free = self.free.get(key)
+        if free is None:
+            free = self.free[key] = []
+        if len(free) < self.limit:
+            free.append(item)
+
+    def clear(self):
+        self.free.clear()
\ No newline at end of file
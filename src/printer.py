@@ -1,78 +1,224 @@
+import atexit
+import sys
+from functools import lru_cache
+from .functions import wait_button
+from .enumeration import AttackType, LogLevel
+from .log import Log
+
+# Bar bodies indexed by 2 * full cells + partial cell
+BAR_GLYPHS = tuple("X" * full + "/" * partial + "-" * (10 - full - partial) for full in range(11) for partial in (0, 1))
+
+
+@lru_cache(maxsize=4096)
+def render_bar(label: str, value: int, maximum: int) -> str:
+    if maximum > 0:
+        full, rest = divmod(value * 10, maximum)
+    else:
+        full, rest = 0, 0
+    return f"{label}: [{BAR_GLYPHS[2 * full + (rest > 0)]}] ({value}/{maximum})"
+
+
+# Output is assembled into a frame and written in one call at the next prompt or wait
 class Printer:
     instance = None
-    log = []
+    log = Log()
+    # Whether wait() blocks for the player, time that can go into preparing the next room
+    waits = True
 
     def __new__(cls):
-        if cls.instance is None:
-            cls.instance = super().__new__(cls)
-        return cls.instance
+        if Printer.instance is None:
+            Printer.instance = super().__new__(cls)
+            Printer.instance.reset()
+        return Printer.instance
+
+    @staticmethod
+    def install(printer_class):
+        Printer.instance = object.__new__(printer_class)
+        Printer.instance.reset()
+        return Printer.instance
+
+    def reset(self):
+        self.frame = []
+        # Status last drawn for each character in this frame, to skip unchanged redraws
+        self.status = {}
 
-    def add_log(self, log: str):
-        self.log.append(log)
+    def write(self, text: str):
+        self.frame.append(text)
+
+    # sys.stdout is looked up here so redirected output is honoured
+    def flush(self):
+        if self.frame:
+            sys.stdout.write("\n".join(self.frame) + "\n")
+            sys.stdout.flush()
+            self.frame.clear()
+        self.status.clear()
+
+    def wait(self):
+        self.flush()
+        wait_button()
+
+    def add_log(self, log: str, level: LogLevel = LogLevel.INFO):
+        self.log.add(log, level)
     
     def show_log(self):
-        for item in self.log:
-            print(f"{item}")
+        self.log.flush()
+        self.write(self.log.render())
+        self.flush()
 
     def message(self, message: str):
-        print(f"{message}")
+        self.write(f"{message}")
 
     def divide_rooms(self):
-        print("_" * 80)
+        self.write("_" * 80)
 
     def show_turn_start(self, character):
-        print(f"\nIt's {character.name}'s turn")
+        self.write(f"\nIt's {character.name}'s turn")
         self.show_hp(character)
         self.show_mp(character)
+        self.status[character] = (character.HP, character.MP)
     
     def show_health(self, character):
-        print(f"\n{character.name}:")
+        if self.status.get(character) == (character.HP, character.MP):
+            return
+        self.write(f"\n{character.name}:")
         self.show_hp(character)
         self.show_mp(character)
+        self.status[character] = (character.HP, character.MP)
 
     def show_hp(self, character):
-        print(f"{character.health_bar()}")
+        self.write(f"{character.health_bar()}")
     
     def show_mp(self, character):
-        print(f"{character.mana_bar()}")
+        self.write(f"{character.mana_bar()}")
 
-    def show_skills(self, character):
-        print(f"\nWhat should {character.name} do?")
+    def show_skills(self, character, enemies=None):
+        self.write(f"\nWhat should {character.name} do?")
         for i, skill in enumerate(character.skills, start=1):
-            print(f"[{i}] {skill.read_skill()}")
-        print(f"[{len(character.skills) + 1}] Pass")
+            self.write(f"[{i}] {skill.read_skill()}{self.skill_preview(character, skill, enemies)}")
+        self.write(f"[{len(character.skills) + 1}] Pass")
     
+    def skill_preview(self, character, skill, enemies) -> str:
+        if not enemies:
+            return ""
+        if skill.type == AttackType.HEAL:
+            return f" [~{skill.expected(character, character):.1f} HP]"
+        target = min(enemies, key=lambda enemy: enemy.HP)
+        return f" [~{skill.expected(character, target):.1f} dmg, {skill.kill_chance(character, target):.0%} to finish {target.name}]"
+
     def show_damage(self, user, target, damage: int, skill):
-        print(f"\n{user.name} uses {skill.name} on {target.name} for {damage} hit points!")
+        self.write(f"\n{user.name} uses {skill.name} on {target.name} for {damage} hit points!")
     
     def show_victory(self):
-        print(f"\nThe enemies have been slain!")
+        self.write(f"\nThe enemies have been slain!")
     
     def show_defeat(self):
-        print(f"\nThe heroes have been defeated!")
+        self.write(f"\nThe heroes have been defeated!")
     
     def choose_character(self, characters: list):
-        print(f"\nChoose a target:")
+        self.write(f"\nChoose a target:")
         self.show_characters(characters)
+        self.write(f"[{len(characters) + 1}] Back")
+
+    def choose_all(self, characters: list):
+        self.write(f"\nChoose a target:\n[1] All")
+        for character in characters:
+            self.write(f"{character.name} {character.health_bar()}")
+        self.write(f"\n[2] Back")
 
     def show_characters(self, characters: list):
         for i, character in enumerate(characters, start=1):
-            print(f"[{i}] {character.name} {character.health_bar()}")
+            self.write(f"[{i}] {character.name} {character.health_bar()}")
     
     def show_death(self, character):
-        print(f"\n{character.name} has fallen!")
+        self.write(f"\n{character.name} has fallen!")
     
     def insuficient_MP(self, character):
-        print(f"\n{character.name} has not enough MP!")
+        self.write(f"\n{character.name} has not enough MP!")
     
     def pass_turn(self, character):
-        print(f"\n{character.name} waits...")
+        self.write(f"\n{character.name} waits...")
     
     def miss_hit(self, character):
-        print(f"\n{character.name}'s attack has failed!")
+        self.write(f"\n{character.name}'s attack has failed!")
+
+    def yes_no_question(self, question: str):
+        self.write(f"{question}\n[1] Yes\n[2] No")
+
+    def crit_hit(self):
+        self.write(f"A critical hit!")
+
+
+
+# Writes whatever is still buffered when the program ends
+@atexit.register
+def flush_at_exit():
+    if Printer.instance is not None:
+        Printer.instance.flush()
+
+
+# Drops every output and prompt, used by headless runs
+class SilentPrinter(Printer):
+    waits = False
+
+    def show_log(self):
+        self.log.flush()
+
+    def wait(self):
+        pass
+
+    def message(self, message: str):
+        pass
+
+    def divide_rooms(self):
+        pass
+
+    def show_turn_start(self, character):
+        pass
+
+    def show_health(self, character):
+        pass
+
+    def show_hp(self, character):
+        pass
+
+    def show_mp(self, character):
+        pass
+
+    def show_skills(self, character, enemies=None):
+        pass
+
+    def show_damage(self, user, target, damage: int, skill):
+        pass
+
+    def show_victory(self):
+        pass
+
+    def show_defeat(self):
+        pass
+
+    def choose_character(self, characters: list):
+        pass
+
+    def choose_all(self, characters: list):
+        pass
+
+    def show_characters(self, characters: list):
+        pass
+
+    def show_death(self, character):
+        pass
+
+    def insuficient_MP(self, character):
+        pass
+
+    def pass_turn(self, character):
+        pass
+
+    def miss_hit(self, character):
+        pass
 
     def yes_no_question(self, question: str):
-        print(f"{question}\n[1] Yes\n[2] No")
+        pass
 
     def crit_hit(self):
-        print(f"A critical hit!")
\ No newline at end of file
+        pass
\ No newline at end of file
@@ -0,0 +1,160 @@
+import functools
+import json
+import time
+from collections import Counter
+from .enumeration import AttackType, Behavior, HitType
+from .printer import Printer, SilentPrinter
+from .battle import Battle
+from .character import MainCharacterFactory, TravelerFactory, MimicFactory, EnemyFactory
+from .room import Room, Dungeon, FountainFactory, EnemyRoomFactory, TravelerRoomFactory, MimicRoomFactory
+
+# Timed methods; times are inclusive, so main_loop also counts its applyDamage calls
+PHASES = (
+    (Battle, "main_loop"),
+    (Battle, "applyDamage"),
+    (Room, "sequence"),
+    (Dungeon, "enter_room"),
+    (MainCharacterFactory, "create_character"),
+    (TravelerFactory, "create_character"),
+    (MimicFactory, "create_character"),
+    (EnemyFactory, "create_character"),
+    (FountainFactory, "create_room"),
+    (EnemyRoomFactory, "create_room"),
+    (TravelerRoomFactory, "create_room"),
+    (MimicRoomFactory, "create_room"),
+)
+# Printer events counted, by the name they are reported with. Hits and deaths come
+# from Battle.listeners instead, where they can be told apart by kind.
+EVENTS = {"insuficient_MP": "mp_failures"}
+
+
+class Profile:
+    def __init__(self):
+        # phase name -> [calls, wall seconds, cpu seconds]
+        self.phases = {}
+        self.events = Counter()
+
+    def record(self, phase: str, wall: float, cpu: float):
+        totals = self.phases.get(phase)
+        if totals is None:
+            totals = self.phases[phase] = [0, 0.0, 0.0]
+        totals[0] += 1
+        totals[1] += wall
+        totals[2] += cpu
+
+    def merge(self, other: "Profile"):
+        for phase, (calls, wall, cpu) in other.phases.items():
+            totals = self.phases.setdefault(phase, [0, 0.0, 0.0])
+            totals[0] += calls
+            totals[1] += wall
+            totals[2] += cpu
+        self.events.update(other.events)
+        return self
+
+    def report(self) -> dict:
+        return {
+            "phases": {phase: {"calls": calls, "wall_seconds": wall, "cpu_seconds": cpu, "mean_wall_us": wall / calls * 1e6}
+                       for phase, (calls, wall, cpu) in sorted(self.phases.items(), key=lambda item: -item[1][1])},
+            "events": dict(self.events),
+        }
+
+    def prometheus(self) -> str:
+        lines = []
+        for metric, column, text in (("calls_total", 0, "Calls per instrumented phase"),
+                                     ("wall_seconds_total", 1, "Wall time spent in each phase"),
+                                     ("cpu_seconds_total", 2, "CPU time spent in each phase")):
+            lines.append(f"# HELP tower_phase_{metric} {text}")
+            lines.append(f"# TYPE tower_phase_{metric} counter")
+            for phase, totals in sorted(self.phases.items()):
+                lines.append(f'tower_phase_{metric}{{phase="{phase}"}} {totals[column]}')
+        lines.append("# HELP tower_events_total Battle events")
+        lines.append("# TYPE tower_events_total counter")
+        for event, count in sorted(self.events.items()):
+            lines.append(f'tower_events_total{{event="{event}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    # Prometheus text for a .prom path, JSON for anything else
+    def export(self, path: str):
+        with open(path, "w", encoding="utf-8") as file:
+            if path.endswith(".prom"):
+                file.write(self.prometheus())
+            else:
+                json.dump(self.report(), file, indent=2)
+
+
+# Counts battle events as Battle reports them: hits and heals apart, deaths by side
+class EventCounter:
+    def __init__(self, events: Counter):
+        self.events = events
+
+    def on_hit(self, user, target, skill, result: dict):
+        if result["hit"] == HitType.FAILED:
+            self.events["misses"] += 1
+            return
+        self.events["heals" if skill.type == AttackType.HEAL else "hits"] += 1
+        if result["hit"] == HitType.CRIT:
+            self.events["crits"] += 1
+
+    def on_death(self, character, killer):
+        self.events["hero_deaths" if character.behavior is Behavior.PLAYABLE else "enemy_deaths"] += 1
+
+    def on_finish(self, battle):
+        pass
+
+
+def timed(profile: Profile, phase: str, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            profile.record(phase, time.perf_counter() - wall, time.process_time() - cpu)
+    return wrapper
+
+
+def counted(profile: Profile, event: str, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        profile.events[event] += 1
+        return method(*args, **kwargs)
+    return wrapper
+
+
+# The methods are only wrapped and the counter only listens while profiling,
+# so a disabled profiler costs nothing
+class Profiler:
+    profile = None
+    patched = []
+    listener = None
+
+    @staticmethod
+    def enable(profile=None) -> Profile:
+        Profiler.disable()
+        profile = profile if profile is not None else Profile()
+        for owner, name in PHASES:
+            Profiler.patch(owner, name, timed(profile, f"{owner.__name__}.{name}", vars(owner)[name]))
+        for owner in (Printer, SilentPrinter):
+            for name, event in EVENTS.items():
+                if name in vars(owner):
+                    Profiler.patch(owner, name, counted(profile, event, vars(owner)[name]))
+        Profiler.listener = EventCounter(profile.events)
+        Battle.listeners.append(Profiler.listener)
+        Profiler.profile = profile
+        return profile
+
+    @staticmethod
+    def patch(owner, name: str, wrapper):
+        Profiler.patched.append((owner, name, vars(owner)[name]))
+        setattr(owner, name, wrapper)
+
+    @staticmethod
+    def disable():
+        while Profiler.patched:
+            owner, name, method = Profiler.patched.pop()
+            setattr(owner, name, method)
+        if Profiler.listener is not None:
+            Battle.listeners.remove(Profiler.listener)
+            Profiler.listener = None
+        profile, Profiler.profile = Profiler.profile, None
+        return profile
\ No newline at end of file
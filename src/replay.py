@@ -0,0 +1,88 @@
+import random
+import struct
+from .functions import rng
+from .policy import HumanPolicy, ScriptedPolicy, ScriptExhausted
+from .character import MainCharacterFactory, PLANNER
+from .room import Dungeon
+from .simulation import headless
+
+MAGIC = b"TETR"
+VERSION = 2
+HEADER = struct.Struct("<4sBqH")
+
+
+def encode_varints(values) -> bytes:
+    data = bytearray()
+    for value in values:
+        while value >= 0x80:
+            data.append(value & 0x7F | 0x80)
+            value >>= 7
+        data.append(value)
+    return bytes(data)
+
+
+def decode_varints(data: bytes) -> list:
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            values.append(value)
+            value = shift = 0
+    return values
+
+
+# A whole run is its seed, the player's name and every option they picked
+class Recording:
+    def __init__(self, seed: int, name: str, choices=None):
+        self.seed = seed
+        self.name = name
+        self.choices = choices if choices is not None else []
+
+    def to_bytes(self) -> bytes:
+        name = self.name.encode("utf-8")
+        return HEADER.pack(MAGIC, VERSION, self.seed, len(name)) + name + encode_varints(self.choices)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Recording":
+        magic, version, seed, size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a supported recording")
+        name = data[HEADER.size:HEADER.size + size].decode("utf-8")
+        return cls(seed, name, decode_varints(data[HEADER.size + size:]))
+
+    def save(self, path: str):
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+def new_seed() -> int:
+    return random.randrange(2 ** 63)
+
+
+def record(name: str, seed=None, checkpoint=None) -> tuple:
+    recording = Recording(new_seed() if seed is None else seed, name)
+    rng.seed(recording.seed)
+    PLANNER.reset()
+    player = MainCharacterFactory().create_character(name, policy=HumanPolicy(record=recording.choices))
+    return Dungeon([player], checkpoint=checkpoint), recording
+
+
+# Replays a recording with no output; stops early if the recording was cut short
+def replay(recording: Recording) -> Dungeon:
+    headless()
+    rng.seed(recording.seed)
+    PLANNER.reset()
+    player = MainCharacterFactory().create_character(recording.name, policy=ScriptedPolicy(recording.choices))
+    dungeon = Dungeon([player])
+    try:
+        dungeon.cicle()
+    except ScriptExhausted:
+        pass
+    return dungeon
\ No newline at end of file
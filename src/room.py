@@ -1,17 +1,45 @@
+import os
 import random
+from collections import deque
 from abc import ABC, abstractmethod
+from .functions import rng
 from .printer import Printer
-from .functions import choose_option, wait_button
 from .character import EnemyFactory, MimicFactory, TravelerFactory
+from .catalog import CATALOG
 from .battle import Battle
+from .save import encode, decode
+from .pool import Pool
+
+# Rooms already played by class, initialised again in place by the factories
+ROOM_POOL = Pool()
 
 class Room(ABC):
+    # Told about every room entered, like Battle.listeners
+    listeners = []
+
     def __init__(self, center: str, description: str):
         self.center = center
         self.description = description
         self.printer = Printer()
+        self.battle = None
+
+    @classmethod
+    def acquire(cls, **fields) -> "Room":
+        room = ROOM_POOL.acquire(cls)
+        if room is None:
+            return cls(**fields)
+        room.__init__(**fields)
+        return room
+
+    # Called once the dungeon has moved on, nothing may use the room afterwards
+    def release(self):
+        self.battle = None
+        ROOM_POOL.release(type(self), self)
 
     def sequence(self, party: list) -> bool:
+        if self.listeners:
+            for listener in self.listeners:
+                listener.on_room(self)
         self.intro()
         self.room_description()
         return self.action(party)
@@ -21,7 +49,10 @@ class Room(ABC):
         self.printer.message(f"\n\nYou enter a room with {self.center}.")
     
     def room_description(self):
-        print(self.description)
+        self.printer.message(self.description)
+
+    def ask(self, party: list, question: str) -> bool:
+        return party[0].policy.yes_no(question)
 
     @abstractmethod
     def action(self, party: list) -> bool:
@@ -29,14 +60,12 @@ class Room(ABC):
 
 class FountainRoom(Room):
     def action(self, party):
-        self.printer.yes_no_question("Will you drink from it?")
-        drink = choose_option(2)
-        if drink == 0:
+        if self.ask(party, "Will you drink from it?"):
             self.printer.message("\nDrinking from it soothes both body and spirit.\nEveryone has their HP and MP restored!")
             for member in party:
                 member.change_HP(member.MHP)
                 member.change_MP(member.MMP)
-                self.printer.add_log(f"- Restored health at the fountain")
+            self.printer.add_log(f"- Restored health at the fountain")
         else:
             self.printer.message("\nYou ignore the water and continue your way.")
             self.printer.add_log(f"- Passed by a fountain")
@@ -47,19 +76,25 @@ class BattleRoom(Room):
         super().__init__(center, description)
         self.enemies = enemies
 
+    # The battle gets its own list, the room keeps every enemy so it can hand them back
     def action(self, party):
-        enemies = self.enemies
-        battle = Battle(heroes=party, enemies=enemies)
-        return battle.main_loop()
+        self.battle = Battle(heroes=party, enemies=list(self.enemies))
+        return self.battle.main_loop()
+
+    def release(self):
+        for enemy in self.enemies:
+            enemy.release()
+        self.enemies = None
+        super().release()
 
 class AdventurerRoom(Room):
+    traveler_factory = TravelerFactory()
+
     def action(self, party):
-        self.printer.yes_no_question("Will you ask the adventurer to join you?")
+        partner = self.ask(party, "Will you ask the adventurer to join you?")
         self.printer.add_log(f"- Found another adventurer")
-        partner = choose_option(2)
-        if partner == 0:
-            names = ["Alex", "Sam", "Harper", "Charlie", "Avery", "Blake", "Ashley", "Robin", "Jessie", "River", "Quinn"]
-            adventurer = TravelerFactory().create_character(random.choice(names))
+        if partner:
+            adventurer = self.traveler_factory.create_character(rng.choice(CATALOG.names), policy=party[0].policy)
             self.printer.message(f"\nYou ask them to join forces with you, it should make surviving easier for everyone.\n{adventurer.name} has joined your party!")
             party.append(adventurer)
             self.printer.add_log(f"- {adventurer.name} joined the party")
@@ -69,74 +104,133 @@ class AdventurerRoom(Room):
 
 
 class MimicRoom(Room):
+    mimic_factory = MimicFactory()
+
     def __init__(self, center, description, disguise: str, mimic: str):
         super().__init__(center, description)
         self.disguise = disguise
         self.mimic = mimic
+        self.spawned = None
 
     def action(self, party):
-        self.printer.yes_no_question(f"Will you {self.disguise}?")
-        option = choose_option(2)
-        if option == 0:
+        if self.ask(party, f"Will you {self.disguise}?"):
             self.printer.message("\nAs you get closer, it suddenly shivers and wobbles.\nThe mimic reveals itself after you fell for its trap!")
-            enemy = [MimicFactory().create_character(self.mimic)]
-            battle = Battle(heroes=party, enemies=enemy)
+            self.spawned = self.mimic_factory.create_character(self.mimic)
+            self.battle = Battle(heroes=party, enemies=[self.spawned])
             self.printer.add_log(f"- Fell for the trap of the mimic")
-            return battle.main_loop()
+            return self.battle.main_loop()
         else:
             self.printer.message("\nYou quickly avoid it and go to the next room.")
             self.printer.add_log(f"- Avoided the trap of the mimic")
             return party
 
+    def release(self):
+        if self.spawned is not None:
+            self.spawned.release()
+            self.spawned = None
+        super().release()
+
 
 class RoomFactory(ABC):
     @abstractmethod
-    def create_room(self) -> Room:
+    def create_room(self, depth: int = 0, rng=rng) -> Room:
         pass
 
 class FountainFactory(RoomFactory):
-    def create_room(self) -> Room:
-        match random.randint(1, 4):
-            case 1:
-                return FountainRoom(center="a crystal spring", description="A pool of pristine water glows with a pale blue light, rippling gently as if stirred by unseen hands.")
-            case 2:
-                return FountainRoom(center="a pedestal", description="On the pedestal rests a simple chalice brimming with liquid light.")
-            case 3:
-                return FountainRoom(center="a blood-red spring", description="The water glows faintly crimson, unsettling yet strangely tentative.")
-            case 4:
-                return FountainRoom(center="an overgrown well", description="Roots and moss cling to a broken well, yet its waters remain impossibly pure")
+    def create_room(self, depth=0, rng=rng) -> Room:
+        return FountainRoom.acquire(**rng.choice(CATALOG.fountains))
 
 class EnemyRoomFactory(RoomFactory):
-    def create_room(self) -> Room:
-        enemies = []
-        total = random.randint(1, 3)
-        for i in range(total):
-            enemies.append(EnemyFactory().create_character(name=""))
-        return BattleRoom(center="shadowy figures", description="The figures get closer, get ready to fight!", enemies=enemies)
+    enemy_factory = EnemyFactory()
+
+    def create_room(self, depth=0, rng=rng) -> Room:
+        total = CATALOG.enemy_counts.sample(depth, rng)
+        enemies = [self.enemy_factory.create_character("", depth, rng) for _ in range(total)]
+        return BattleRoom.acquire(**rng.choice(CATALOG.battles), enemies=enemies)
 
 class TravelerRoomFactory(RoomFactory):
-    def create_room(self) -> Room:
-        return AdventurerRoom(center="another adventurer taking a break", description="The other adventurer looks at you and nods.")
+    def create_room(self, depth=0, rng=rng) -> Room:
+        return AdventurerRoom.acquire(**rng.choice(CATALOG.traveler_rooms))
 
 class MimicRoomFactory(RoomFactory):
-    def create_room(self):
-        match random.randint(1, 2):
-            case 1:
-                room = MimicRoom(center="a pedestal", description="On the pedestal rests a luxurious chalice brimming with a dark liquid.", disguise="drink from it", mimic="chalice")
-            case 2:
-                room = MimicRoom(center="another adventurer taking a break", description="The other adventurer stares at you.", disguise="ask the adventurer to join you", mimic="adventurer")
-        return room
+    def create_room(self, depth=0, rng=rng):
+        return MimicRoom.acquire(**rng.choice(CATALOG.mimics))
+
+# The factories keep no state, one instance of each is shared
+ROOM_FACTORIES = {"fountain": FountainFactory(), "traveler": TravelerRoomFactory(), "mimic": MimicRoomFactory(), "battle": EnemyRoomFactory()}
+
+
+# Builds the next rooms ahead of time from its own random stream, so combat rolls
+# never shift the layout. Each queued room keeps the stream state it was built from,
+# which is what a save needs to rebuild the same rooms later. next() only builds when
+# the queue is empty and then fills it in one batch. Interactive play also refills it
+# while waiting for the player, so entering a room only pops the queue; headless runs
+# have nothing to wait for and only build in next().
+class RoomGenerator:
+    def __init__(self, seed=None, depth: int = 0, lookahead: int = 4, state=None):
+        self.rng = random.Random(seed)
+        if state is not None:
+            self.rng.setstate(state)
+        self.depth = depth
+        self.lookahead = lookahead
+        self.queue = deque()
+
+    def build(self) -> tuple:
+        state = self.rng.getstate()
+        self.depth += 1
+        kind = CATALOG.room_spawns.sample(self.depth, self.rng)
+        return state, ROOM_FACTORIES[kind].create_room(self.depth, self.rng)
+
+    def prefetch(self, count=None):
+        count = self.lookahead if count is None else count
+        while len(self.queue) < count:
+            self.queue.append(self.build())
+
+    def next(self) -> Room:
+        if not self.queue:
+            self.prefetch(max(1, self.lookahead))
+        return self.queue.popleft()[1]
+
+    # Stream state before the first room that has not been handed out yet
+    def state(self) -> tuple:
+        if self.queue:
+            return self.queue[0][0]
+        return self.rng.getstate()
 
 
 class Dungeon:
-    def __init__(self, party):
+    def __init__(self, party, checkpoint=None, rooms=None, lookahead=4):
         self.current = 0
         self.party = party
+        self.room = None
+        self.checkpoint = checkpoint
         self.printer = Printer()
+        self.rooms = rooms if rooms is not None else RoomGenerator(rng.getrandbits(64), lookahead=lookahead)
+
+    def to_bytes(self) -> bytes:
+        return encode(self)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, policy=None, checkpoint=None) -> "Dungeon":
+        current, party, state = decode(data, policy)
+        dungeon = cls(party, checkpoint=checkpoint, rooms=RoomGenerator(depth=current, state=state))
+        dungeon.current = current
+        return dungeon
+
+    def save(self, path: str):
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as file:
+            file.write(self.to_bytes())
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str, policy=None, checkpoint=None) -> "Dungeon":
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read(), policy, checkpoint)
 
     def game_over(self):
         self.printer.divide_rooms()
-        match random.randint(1, 4):
+        match rng.randint(1, 4):
             case 1:
                 self.printer.message("\nThe tower swallows your final breath. Another soul lost in its endless halls.")
             case 2:
@@ -147,25 +241,44 @@ class Dungeon:
                 self.printer.message("\nYou fall down. Not even the carrion eaters are interested in your now cursed corpse.")
         self.printer.divide_rooms()
         self.printer.message(f"\n\nGAME OVER\nYou got througt {self.current} rooms\n")
-        wait_button()
+        self.printer.wait()
         self.printer.add_log("End of the run")
         self.printer.show_log()
 
     def enter_room(self) -> bool:
-        chance = random.randint(1, 5)
-        if chance == 1:
-            room = FountainFactory().create_room()
-        elif chance == 2:
-            room = TravelerRoomFactory().create_room()
-        elif chance == 3:
-            room = MimicRoomFactory().create_room()
-        else:
-            room = EnemyRoomFactory().create_room()
+        if self.room is not None:
+            self.room.release()
+        room = self.rooms.next()
+        self.room = room
         return room.sequence(self.party)
 
+    def step(self) -> Room:
+        self.current += 1
+        self.printer.add_log(f"Entered room {self.current}")
+        self.party = self.enter_room()
+        if self.checkpoint is not None:
+            if len(self.party) > 0:
+                self.save(self.checkpoint)
+            elif os.path.exists(self.checkpoint):
+                os.remove(self.checkpoint)
+        return self.room
+
+    def explore(self, max_rooms=None) -> int:
+        while len(self.party) > 0 and (max_rooms is None or self.current < max_rooms):
+            self.step()
+            if len(self.party) > 0:
+                if self.printer.waits:
+                    self.rooms.prefetch()
+                self.printer.wait()
+        return self.current
+
     def cicle(self):
-        alive = True
-        print(f"""
+        self.intro()
+        self.printer.wait()
+        self.play()
+
+    def intro(self):
+        self.printer.message(f"""
 The tower's doors open without a sound. Beyond them lies only darkness, and the promise of endless rooms.
 It waits in silence, daring you to step inside...
 
@@ -184,12 +297,8 @@ blessing.
 
 You enter the first room, and already the exit behind you is gone. The only way is forward, deeper into
 the unknown. Every step you take echoes endlessly. The tower feels empty, yet you know it is watching.\n\n""")
-        wait_button()
-        while alive:
-            self.current += 1
-            self.printer.add_log(f"Entered room {self.current}")
-            self.party = self.enter_room()
-            if len(self.party) == 0:
-                alive = False
-            wait_button()
+
+    def play(self):
+        self.explore()
+        self.printer.wait()
         self.game_over()
\ No newline at end of file
@@ -0,0 +1,53 @@
+# Walker's alias method: O(n) to build, O(1) per draw
+class AliasTable:
+    __slots__ = ("items", "probability", "alias")
+
+    def __init__(self, items: list, weights: list):
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("At least one weight must be positive")
+        size = len(items)
+        scaled = [weight * size / total for weight in weights]
+        self.items = tuple(items)
+        self.probability = [1.0] * size
+        self.alias = list(range(size))
+        small = [i for i, value in enumerate(scaled) if value < 1]
+        large = [i for i, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1 - scaled[less]
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def sample(self, rng):
+        roll = rng.random() * len(self.items)
+        index = int(roll)
+        if roll - index < self.probability[index]:
+            return self.items[index]
+        return self.items[self.alias[index]]
+
+
+# Weights of base + slope * depth, one alias table per depth bucket up to a cap
+class SpawnTable:
+    def __init__(self, items: list, weights: list, bucket: int = 10, cap: int = 100):
+        self.items = tuple(items)
+        self.weights = tuple(weights)
+        self.bucket = bucket
+        self.cap = cap
+        self.tables = {}
+
+    def table(self, depth: int) -> AliasTable:
+        level = min(depth, self.cap) // self.bucket
+        table = self.tables.get(level)
+        if table is None:
+            depth = level * self.bucket
+            table = AliasTable(self.items, [max(0.0, base + slope * depth) for base, slope in self.weights])
+            self.tables[level] = table
+        return table
+
+    def sample(self, depth: int, rng):
+        return self.table(depth).sample(rng)
\ No newline at end of file
@@ -0,0 +1,92 @@
+import struct
+from .functions import rng
+from .printer import Printer
+from .character import PlayableCharacter
+from .catalog import CATALOG
+
+MAGIC = b"TETS"
+VERSION = 3
+HEADER = struct.Struct("<4sBIHH")
+RNG_STATE = struct.Struct("<625I?d")
+STATS = struct.Struct("<9i")
+
+
+def pack_text(text: str) -> bytes:
+    data = text.encode("utf-8")
+    return struct.pack("<H", len(data)) + data
+
+
+def unpack_text(data: bytes, offset: int) -> tuple:
+    (size,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    return data[offset:offset + size].decode("utf-8"), offset + size
+
+
+def pack_state(state: tuple) -> bytes:
+    _, words, gauss = state
+    return RNG_STATE.pack(*words, gauss is not None, gauss or 0.0)
+
+
+def unpack_state(data: bytes, offset: int) -> tuple:
+    *words, has_gauss, gauss = RNG_STATE.unpack_from(data, offset)
+    return (3, tuple(words), gauss if has_gauss else None), offset + RNG_STATE.size
+
+
+# Room count, party, log and random states; skills and equipment are stored as catalog ids,
+# looked up in the catalog installed now. Timed modifiers end with each battle, so there are
+# none between rooms.
+def encode(dungeon) -> bytes:
+    skill_ids = {skill: skill_id for skill_id, skill in CATALOG.skills.items()}
+    modifier_ids = {modifier: modifier_id for modifier_id, modifier in CATALOG.modifiers.items()}
+    log = list(Printer.log)
+    chunks = [HEADER.pack(MAGIC, VERSION, dungeon.current, len(dungeon.party), len(log))]
+    chunks.append(pack_state(rng.getstate()))
+    chunks.append(pack_state(dungeon.rooms.state()))
+    for member in dungeon.party:
+        chunks.append(pack_text(member.name))
+        chunks.append(STATS.pack(member.MHP, member.HP, member.MMP, member.MP, member.ATK, member.MAG, member.DEF, member.RES, member.SPD))
+        chunks.append(struct.pack("<B", len(member.skills)))
+        chunks.extend(pack_text(skill_ids[skill]) for skill in member.skills)
+        equipment = [modifier for modifier, _ in member.modifiers if not modifier.timed]
+        chunks.append(struct.pack("<B", len(equipment)))
+        chunks.extend(pack_text(modifier_ids[modifier]) for modifier in equipment)
+    chunks.extend(pack_text(entry) for entry in log)
+    return b"".join(chunks)
+
+
+# Restores the random state and the log, returns the room count, the party and the room stream state
+def decode(data: bytes, policy) -> tuple:
+    magic, version, current, members, entries = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a supported save file")
+    offset = HEADER.size
+    state, offset = unpack_state(data, offset)
+    rooms, offset = unpack_state(data, offset)
+    party = []
+    for _ in range(members):
+        name, offset = unpack_text(data, offset)
+        MHP, HP, MMP, MP, ATK, MAG, DEF, RES, SPD = STATS.unpack_from(data, offset)
+        offset += STATS.size
+        member = PlayableCharacter(name=name, HP=MHP, MP=MMP, ATK=ATK, MAG=MAG, DEF=DEF, RES=RES, SPD=SPD, policy=policy)
+        member.HP = HP
+        member.MP = MP
+        (skills,) = struct.unpack_from("<B", data, offset)
+        offset += 1
+        for _ in range(skills):
+            skill_id, offset = unpack_text(data, offset)
+            member.learn_skill(CATALOG.skills[skill_id])
+        (equipment,) = struct.unpack_from("<B", data, offset)
+        offset += 1
+        for _ in range(equipment):
+            modifier_id, offset = unpack_text(data, offset)
+            member.add_modifier(CATALOG.modifiers[modifier_id])
+        party.append(member)
+    log = []
+    for _ in range(entries):
+        entry, offset = unpack_text(data, offset)
+        log.append(entry)
+    rng.setstate(state)
+    Printer.log.clear()
+    for entry in log:
+        Printer.log.entries.append(entry)
+    return current, party, rooms
\ No newline at end of file
@@ -0,0 +1,57 @@
+import heapq
+
+# Time units between two actions of a speed 1 character, divisible by every speed up to 16
+TICK = 720720
+
+
+# Event-driven turn order: a heap of (next action time, order, actor)
+class TurnScheduler:
+    def __init__(self):
+        self.queue = []
+        self.time = 0
+        # The queue is shared with a snapshot and must be copied before it changes
+        self.shared = False
+
+    def __len__(self):
+        return len(self.queue)
+
+    def delay(self, speed: int) -> int:
+        return TICK // max(1, speed)
+
+    def own(self):
+        if self.shared:
+            self.queue = list(self.queue)
+            self.shared = False
+
+    def snapshot(self) -> tuple:
+        self.shared = True
+        return self.queue, self.time
+
+    def restore(self, snapshot: tuple):
+        self.queue, self.time = snapshot
+        self.shared = True
+
+    def add(self, actor, order: int, speed: int):
+        self.own()
+        heapq.heappush(self.queue, (self.time + self.delay(speed), order, actor))
+
+    # The actors of the next turns, in order, without advancing the schedule
+    def upcoming(self, count: int) -> list:
+        queue = list(self.queue)
+        actors = []
+        while queue and len(actors) < count:
+            time, order, actor = heapq.heappop(queue)
+            actors.append(actor)
+            heapq.heappush(queue, (time + self.delay(actor.get_SPD()), order, actor))
+        return actors
+
+    # Pops the next actor that is still able to act, dropping the rest lazily
+    def next(self, active):
+        self.own()
+        while self.queue:
+            time, order, actor = heapq.heappop(self.queue)
+            if active(actor):
+                self.time = time
+                heapq.heappush(self.queue, (time + self.delay(actor.get_SPD()), order, actor))
+                return actor
+        return None
\ No newline at end of file
@@ -0,0 +1,176 @@
+import argparse
+import asyncio
+import functools
+import io
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from .functions import rng
+from .printer import Printer
+from .policy import HumanPolicy
+from .character import MainCharacterFactory, PLANNER
+from .room import Dungeon
+from .replay import new_seed
+
+
+# Raised at a prompt that has no answer yet, the session resumes once one arrives
+class AwaitingInput(Exception):
+    def __init__(self, options: int):
+        super().__init__(options)
+        self.options = options
+
+
+# Prints menus like a local player but takes its answers from the session
+class SessionPolicy(HumanPolicy):
+    def __init__(self, answers: list):
+        super().__init__()
+        self.answers = answers
+        self.position = 0
+
+    def ask(self, options):
+        if self.position == len(self.answers):
+            raise AwaitingInput(options)
+        self.position += 1
+        return self.answers[self.position - 1]
+
+
+# Nobody presses enter over the wire, output just keeps flowing
+class StreamPrinter(Printer):
+    def wait(self):
+        pass
+
+
+def worker_init():
+    Printer.install(StreamPrinter)
+
+
+# Plays from a room snapshot with the answers given in it until the next prompt or the end
+# of the run. Everything it needs comes in its arguments and the random state, log and
+# planner are all restored from the snapshot, so it can run in any worker process.
+# Returns the unseen output, the snapshot, answers and output already sent of the room it
+# stopped in, the options of the prompt and whether the run is over.
+def advance(snapshot: bytes, answers: list, sent: int) -> tuple:
+    chunks = []
+    while True:
+        options = None
+        over = False
+        PLANNER.reset()
+        dungeon = Dungeon.from_bytes(snapshot, policy=SessionPolicy(answers))
+        with redirect_stdout(io.StringIO()) as output:
+            try:
+                dungeon.step()
+                if len(dungeon.party) == 0:
+                    dungeon.game_over()
+                    over = True
+            except AwaitingInput as prompt:
+                options = prompt.options
+            Printer().flush()
+        text = output.getvalue()
+        chunks.append(text[sent:])
+        if over:
+            return "".join(chunks), snapshot, answers, sent, None, True
+        if options is not None:
+            return "".join(chunks) + "Option: ", snapshot, answers, len(text), options, False
+        snapshot = dungeon.to_bytes()
+        answers = []
+        sent = 0
+
+
+# One player's run. Between prompts a session is only the snapshot of the room it is in
+# and the answers given in that room: every answer replays the room from the snapshot,
+# and only the output the player has not seen yet is sent. Replays run in an executor
+# when one is given, so a long room never holds up the event loop.
+class Session:
+    def __init__(self, name: str, seed=None):
+        self.seed = new_seed() if seed is None else seed
+        self.answers = []
+        self.sent = 0
+        self.options = None
+        self.over = False
+        rng.seed(self.seed)
+        PLANNER.reset()
+        Printer.log.clear()
+        player = MainCharacterFactory().create_character(name, policy=SessionPolicy(self.answers))
+        dungeon = Dungeon([player])
+        with redirect_stdout(io.StringIO()) as output:
+            dungeon.intro()
+            Printer().flush()
+        self.intro = output.getvalue()
+        self.snapshot = dungeon.to_bytes()
+
+    async def start(self, executor=None) -> str:
+        return self.intro + await self.play(executor)
+
+    async def answer(self, option: int, executor=None) -> str:
+        self.answers.append(option)
+        return await self.play(executor)
+
+    async def play(self, executor=None) -> str:
+        if executor is None:
+            result = advance(self.snapshot, list(self.answers), self.sent)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(executor, advance, self.snapshot, list(self.answers), self.sent)
+        text, self.snapshot, answers, self.sent, self.options, self.over = result
+        self.answers[:] = answers
+        return text
+
+    # Same rules as choose_option: 1-based, up to one past the last listed option
+    def parse(self, line: str):
+        try:
+            option = int(line) - 1
+        except ValueError:
+            return None
+        if 0 <= option <= self.options:
+            return option
+        return None
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, executor=None):
+    try:
+        writer.write(b"\nPlease enter your name: ")
+        await writer.drain()
+        name = (await reader.readline()).decode("utf-8", "replace").strip() or "Hero"
+        session = Session(name)
+        writer.write((await session.start(executor)).encode("utf-8"))
+        await writer.drain()
+        while not session.over:
+            line = await reader.readline()
+            if not line:
+                break
+            option = session.parse(line.decode("utf-8", "replace").strip())
+            if option is None:
+                writer.write(b"Value is not valid!\nOption: ")
+            else:
+                writer.write((await session.answer(option, executor)).encode("utf-8"))
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+# Stops on SIGINT or SIGTERM by closing the server, so the worker processes are shut down too
+async def serve(host: str, port: int, workers=None):
+    Printer.install(StreamPrinter)
+    with ProcessPoolExecutor(max_workers=workers, initializer=worker_init) as executor:
+        server = await asyncio.start_server(functools.partial(handle, executor=executor), host, port)
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signal_number, server.close)
+            except NotImplementedError:
+                pass
+        async with server:
+            try:
+                await server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the Endless Tower to many players over TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8023)
+    parser.add_argument("--workers", type=int, default=None, help="processes replaying rooms, one per CPU by default")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.workers))
\ No newline at end of file
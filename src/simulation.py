@@ -0,0 +1,17 @@
+from .printer import Printer, SilentPrinter
+from .policy import GreedyPolicy
+from .character import MainCharacterFactory
+from .room import Dungeon
+
+
+def headless():
+    return Printer.install(SilentPrinter)
+
+
+def simulate_run(policy=None, max_rooms=None, name="Hero") -> int:
+    headless()
+    if policy is None:
+        policy = GreedyPolicy()
+    player = MainCharacterFactory().create_character(name, policy=policy)
+    dungeon = Dungeon([player])
+    return dungeon.explore(max_rooms)
\ No newline at end of file
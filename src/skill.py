@@ -1,31 +1,52 @@
 from abc import ABC, abstractmethod
 from .functions import dice_roll
-from .enumeration import HitType, Behavior
-from .functions import choose_option
+from .enumeration import HitType
+from .distribution import distribution
 
 
-# Returns a list of valid targets for a skill
+# Returns a list of valid targets for a skill, one shared instance per strategy
 class Objective(ABC):
+    __slots__ = ()
+    area = False
+    instances = {}
+
+    def __new__(cls):
+        if cls not in Objective.instances:
+            Objective.instances[cls] = super().__new__(cls)
+        return Objective.instances[cls]
+
+    def __reduce__(self):
+        return (type(self), ())
+
     @abstractmethod
     def candidates(self, user, allies, enemies):
         pass
 
 
-# Skills
+# Skills, interned by their whole definition and immutable once built
 class Skill(ABC):
-    flyweight = {}
-    def __init__(self, name: str, description: str, attack_type, target_strategy, use_strategy, cost: int):
-        self.name = name
-        self.description = description
-        self.cost = cost
-        self.type = attack_type
-        self.target_strategy = target_strategy
-        self.use_strategy = use_strategy
-
-    def __new__(cls, name, description, attack_type, target_strategy, use_strategy, cost):
-        if name not in cls.flyweight:
-            cls.flyweight[name] = super().__new__(cls)
-        return cls.flyweight[name]
+    __slots__ = ("name", "description", "cost", "type", "target_strategy", "use_strategy")
+    registry = {}
+
+    def __new__(cls, name: str, description: str, attack_type, target_strategy, use_strategy, cost: int):
+        key = (cls, name, description, attack_type, target_strategy, use_strategy, cost)
+        skill = Skill.registry.get(key)
+        if skill is None:
+            skill = super().__new__(cls)
+            object.__setattr__(skill, "name", name)
+            object.__setattr__(skill, "description", description)
+            object.__setattr__(skill, "cost", cost)
+            object.__setattr__(skill, "type", attack_type)
+            object.__setattr__(skill, "target_strategy", target_strategy)
+            object.__setattr__(skill, "use_strategy", use_strategy)
+            Skill.registry[key] = skill
+        return skill
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Skill {self.name} is immutable")
+
+    def __reduce__(self):
+        return (type(self), (self.name, self.description, self.type, self.target_strategy, self.use_strategy, self.cost))
 
     def read_skill(self) -> str:
         return (f"{self.name}: {self.description}, {self.use_strategy.power} + {self.use_strategy.dice}d{self.use_strategy.die} ({self.cost} MP)")
@@ -33,101 +54,137 @@ class Skill(ABC):
     def roll_hit(self) -> int:
         return dice_roll(20, 1)
 
+    def distribution(self, user, target):
+        return distribution(self, self.use_strategy.modifier(user, target))
+
+    def expected(self, user, target) -> float:
+        return self.distribution(user, target).mean
+
+    def kill_chance(self, user, target) -> float:
+        return self.distribution(user, target).kill_chance(target.HP)
+
     @abstractmethod
     def use(self, user, target) -> int:
         pass
 
 class DamageSkill(Skill):
+    __slots__ = ()
+    critical = True
+
     def use(self, user, target):
         roll = self.roll_hit()
         damage = self.use_strategy.calculate(user, target)
         if roll == 20:
-            return {"damage": damage * 2, "hit": HitType.CRIT}
+            return {"damage": damage * 2, "hit": HitType.CRIT, "roll": roll}
         elif roll == 1:
-            return {"damage": 0, "hit": HitType.FAILED}
+            return {"damage": 0, "hit": HitType.FAILED, "roll": roll}
         else:
-            return {"damage": damage, "hit": HitType.NORMAL}
+            return {"damage": damage, "hit": HitType.NORMAL, "roll": roll}
 
 class HealingSkill(Skill):
+    __slots__ = ()
+    critical = False
+
     def use(self, user, target):
         damage = self.use_strategy.calculate(user, target)
         return {"damage": damage, "hit": HitType.NORMAL}
 
 
+# Damage formulas, one shared instance per (formula, power, die, dice)
 class Attack(ABC):
-    def __init__(self, power: int, die: int, dice: int):
-        self.power = power
-        self.die = die
-        self.dice = dice
+    __slots__ = ("power", "die", "dice")
+    clamp = True
+    instances = {}
+
+    def __new__(cls, power: int, die: int, dice: int):
+        key = (cls, power, die, dice)
+        attack = Attack.instances.get(key)
+        if attack is None:
+            attack = super().__new__(cls)
+            object.__setattr__(attack, "power", power)
+            object.__setattr__(attack, "die", die)
+            object.__setattr__(attack, "dice", dice)
+            Attack.instances[key] = attack
+        return attack
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Attack strategies are immutable")
+
+    def __reduce__(self):
+        return (type(self), (self.power, self.die, self.dice))
+
+    @abstractmethod
+    def modifier(self, user, target) -> int:
+        pass
+
     @abstractmethod
     def calculate(self):
         pass
 
 class PhysicalAttack(Attack):
-    def __init__(self, power, die, dice):
-        super().__init__(power, die, dice)
+    __slots__ = ()
+
+    def modifier(self, user, target):
+        return user.get_ATK() - target.get_DEF()
 
     def calculate(self, user, target):
         roll = dice_roll(sides= self.die, dice= self.dice)
-        return  max(1, self.power + roll + user.get_ATK() - target.get_DEF())
+        return  max(1, self.power + roll + self.modifier(user, target))
 
 class MagicalAttack(Attack):
-    def __init__(self, power, die, dice):
-        super().__init__(power, die, dice)
+    __slots__ = ()
+
+    def modifier(self, user, target):
+        return user.get_MAG() - target.get_RES()
 
     def calculate(self, user, target):
         roll = dice_roll(sides=self.die, dice= self.dice)
-        return max(1, self.power + roll + user.get_MAG() - target.get_RES())
+        return max(1, self.power + roll + self.modifier(user, target))
 
 class MagicalHeal(Attack):
-    def __init__(self, power, die, dice):
-        super().__init__(power, die, dice)
+    __slots__ = ()
+    clamp = False
+
+    def modifier(self, user, target):
+        return user.get_MAG()
 
     def calculate(self, user, target):
         roll = dice_roll(sides=self.die, dice= self.dice)
-        return self.power + roll + user.get_MAG()
+        return self.power + roll + self.modifier(user, target)
 
 
 class EnemyObjective(Objective):
+    __slots__ = ()
+
     def candidates(self, user, allies: list, enemies: list):
-        if user.behavior is Behavior.PLAYABLE:
-            print(f"\nChoose a target:")
-            for i, character in enumerate(enemies, start=1):
-                print(f"[{i}] {character.name} {character.health_bar()}")
-            print(f"[{len(enemies) + 1}] Back")
         return [user.pick_target(enemies)]
 
 class AlliedObjective(Objective):
+    __slots__ = ()
+
     def candidates(self, user, allies: list, enemies: list):
-        if user.behavior is Behavior.PLAYABLE:
-            print(f"\nChoose a target:")
-            for i, character in enumerate(allies, start=1):
-                print(f"[{i}] {character.name} {character.health_bar()}")
-            print(f"[{len(allies) + 1}] Back")
         return [user.pick_target(allies)]
 
 class AllEnemyObjective(Objective):
+    __slots__ = ()
+    area = True
+
     def candidates(self, user, allies, enemies):
-        if user.behavior is Behavior.PLAYABLE:
-            print(f"\nChoose a target:\n[1] All")
-            for character in enemies:
-                print(f"{character.name} {character.health_bar()}")
-            print(f"\n[2] Back")
-            if choose_option(2) == 1:
-                return [None]
-        return enemies
+        if not user.confirm_targets(enemies):
+            return [None]
+        return tuple(enemies)
 
 class AllAlliedObjective(Objective):
+    __slots__ = ()
+    area = True
+
     def candidates(self, user, allies, enemies):
-        if user.behavior is Behavior.PLAYABLE:
-            print(f"\nChoose a target:\n[1] All")
-            for character in allies:
-                print(f"{character.name} {character.health_bar()}")
-            print(f"\n[2] Back")
-            if choose_option(2) == 1:
-                return [None]
-        return allies
+        if not user.confirm_targets(allies):
+            return [None]
+        return tuple(allies)
 
 class SelfObjective(Objective):
+    __slots__ = ()
+
     def candidates(self, user, allies, enemies):
         return [user]
\ No newline at end of file
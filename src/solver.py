@@ -0,0 +1,321 @@
+import argparse
+import heapq
+import itertools
+import json
+import math
+from collections import OrderedDict, defaultdict
+from .catalog import CATALOG
+from .enumeration import AttackType
+from .policy import GreedyPolicy
+from .character import PlayableCharacter, EnemyCharacter
+from .scheduler import TICK
+from .skill import AlliedObjective, AllAlliedObjective, SelfObjective
+
+# What AdventurerRoom asks; a mimic with the same disguise cannot be told apart from a traveler
+RECRUIT = "ask the adventurer to join you"
+
+
+# Turn order of one full cycle of the scheduler, as combatant slots
+def turn_cycle(speeds: list) -> list:
+    delays = [TICK // max(1, speed) for speed in speeds]
+    period = math.lcm(*delays)
+    queue = [(delay, slot) for slot, delay in enumerate(delays)]
+    heapq.heapify(queue)
+    cycle = []
+    while queue[0][0] <= period:
+        time, slot = heapq.heappop(queue)
+        cycle.append(slot)
+        heapq.heappush(queue, (time + delays[slot], slot))
+    return cycle
+
+
+# HP is kept on a grid of about `buckets` points per combatant; a value between two points
+# is split between them so the expected HP is unchanged. 1 is always a point, so rounding
+# down never kills anyone.
+class Grid:
+    def __init__(self, MHP: int, buckets: int):
+        step = max(1, math.ceil(MHP / buckets))
+        self.points = sorted({1, MHP, *range(step, MHP, step)})
+
+    def snap(self, HP: int) -> tuple:
+        if HP <= 0:
+            return ((1.0, 0),)
+        index = next(index for index, point in enumerate(self.points) if point >= HP)
+        high = self.points[index]
+        if high == HP or index == 0:
+            return ((1.0, high),)
+        low = self.points[index - 1]
+        share = (high - HP) / (high - low)
+        return ((share, low), (1 - share, high))
+
+
+# Exact battle outcome over snapped HP: heroes play like GreedyPolicy, enemies like EnemyCharacter
+class BattleChain:
+    def __init__(self, heroes: list, enemies: list, buckets: int, epsilon: float):
+        self.characters = [*heroes, *enemies]
+        self.split = len(heroes)
+        self.grids = [Grid(character.MHP, buckets) for character in self.characters]
+        self.cycle = turn_cycle([character.get_SPD() for character in self.characters])
+        self.epsilon = epsilon
+        self.greedy = GreedyPolicy()
+        self.hits = {}
+        self.moves = {}
+
+    def alive(self, hp: tuple, side: int) -> list:
+        slots = range(self.split) if side == 0 else range(self.split, len(hp))
+        return [slot for slot in slots if hp[slot] > 0]
+
+    # (chance, skill, targets) for the actor in this state
+    def choices(self, slot: int, hp: tuple, mp: tuple) -> list:
+        character = self.characters[slot]
+        side = 0 if slot < self.split else 1
+        allies, foes = self.alive(hp, side), self.alive(hp, 1 - side)
+        usable = [skill for skill in character.skills if skill.cost <= mp[slot]]
+        if side == 0:
+            hurt = any(hp[ally] * 2 < self.characters[ally].MHP for ally in allies)
+            heals = [skill for skill in usable if skill.type == AttackType.HEAL]
+            if hurt and heals:
+                skill = max(heals, key=lambda skill: (self.greedy.score(skill, allies), -skill.cost))
+            else:
+                attacks = [skill for skill in usable if skill.type != AttackType.HEAL]
+                skill = max(attacks, key=lambda skill: (self.greedy.score(skill, foes), -skill.cost))
+            picks = [(1.0, skill)]
+        else:
+            picks = [(1 / len(usable), skill) for skill in usable]
+        choices = []
+        for chance, skill in picks:
+            strategy = skill.target_strategy
+            if isinstance(strategy, SelfObjective):
+                choices.append((chance, skill, (slot,)))
+                continue
+            targets = allies if isinstance(strategy, (AlliedObjective, AllAlliedObjective)) else foes
+            if strategy.area:
+                choices.append((chance, skill, tuple(targets)))
+            elif side == 0:
+                target = min(targets, key=lambda target: hp[target] / self.characters[target].MHP)
+                choices.append((chance, skill, (target,)))
+            else:
+                choices.extend((chance / len(targets), skill, (target,)) for target in targets)
+        return choices
+
+    # Grid HP of the target after one hit as (chance, HP), merged and cached per grid point
+    def hit(self, slot: int, skill, target: int, HP: int) -> list:
+        key = (slot, skill, target, HP)
+        outcomes = self.hits.get(key)
+        if outcomes is None:
+            pmf = skill.distribution(self.characters[slot], self.characters[target]).pmf
+            merged = defaultdict(float)
+            for value, chance in enumerate(pmf):
+                if chance == 0:
+                    continue
+                if skill.type == AttackType.HEAL:
+                    after = min(self.characters[target].MHP, HP + value)
+                else:
+                    after = HP - value
+                for snap_chance, snapped in self.grids[target].snap(after):
+                    merged[snapped] += chance * snap_chance
+            outcomes = self.hits[key] = [(chance, HP) for HP, chance in merged.items()]
+        return outcomes
+
+    # Where one turn leads from a state: the chance of a wipe, the won end states and the
+    # states the battle goes on from, all cached per state
+    def move(self, state: tuple) -> tuple:
+        outcomes = self.moves.get(state)
+        if outcomes is not None:
+            return outcomes
+        hp, mp, position = state
+        while hp[self.cycle[position]] <= 0:
+            position = (position + 1) % len(self.cycle)
+        slot = self.cycle[position]
+        following = (position + 1) % len(self.cycle)
+        merged = defaultdict(float)
+        for chance, skill, targets in self.choices(slot, hp, mp):
+            after_mp = mp
+            if slot < self.split:
+                after_mp = mp[:slot] + (mp[slot] - skill.cost,) + mp[slot + 1:]
+            states = [(chance, hp)]
+            for target in targets:
+                resolved = []
+                for state_chance, after in states:
+                    for hit_chance, HP in self.hit(slot, skill, target, after[target]):
+                        resolved.append((state_chance * hit_chance, after[:target] + (HP,) + after[target + 1:]))
+                states = resolved
+            for state_chance, after in states:
+                merged[(after, after_mp)] += state_chance
+        loss, wins, goes_on = 0.0, [], []
+        for (after_hp, after_mp), chance in merged.items():
+            if not any(after_hp[:self.split]):
+                loss += chance
+            elif not any(after_hp[self.split:]):
+                wins.append((chance, (after_hp[:self.split], after_mp[:self.split])))
+            else:
+                goes_on.append((chance, (after_hp, after_mp, following)))
+        outcomes = self.moves[state] = (loss, wins, goes_on)
+        return outcomes
+
+    # Pushes a whole distribution of starting states through the battle at once. Returns the
+    # mass of every end state the heroes win, keyed by their (HP, MP), and the mass they lose
+    def run(self, starts: dict, max_turns: int = 500) -> tuple:
+        frontier = {(hp, mp, 0): chance for (hp, mp), chance in starts.items()}
+        threshold = self.epsilon * sum(starts.values())
+        wins = defaultdict(float)
+        loss = 0.0
+        for _ in range(max_turns):
+            if not frontier:
+                break
+            following = defaultdict(float)
+            for state, chance in frontier.items():
+                lost, won, goes_on = self.move(state)
+                loss += chance * lost
+                for move_chance, end in won:
+                    wins[end] += chance * move_chance
+                for move_chance, after in goes_on:
+                    following[after] += chance * move_chance
+            # Lines negligible next to the whole batch are dropped and counted as losses,
+            # keeping the answer pessimistic
+            frontier = {}
+            for state, chance in following.items():
+                if chance < threshold:
+                    loss += chance
+                else:
+                    frontier[state] = chance
+        loss += sum(frontier.values())
+        return wins, loss
+
+
+# Survival curve of a party, room by room, as a distribution over party states. A party
+# state is a tuple of (template, HP, MP) per member in join order. The party plays like
+# GreedyPolicy except that it only answers the traveler question with yes while it is
+# smaller than `cap`; every member multiplies the battle states, so by default it never
+# recruits. Planner enemies are treated as random ones and an encounter is solved with
+# its enemies sorted by name.
+class SurvivalSolver:
+    def __init__(self, party: tuple = ("hero",), cap: int = None, buckets: int = 4, epsilon: float = 1e-6, table_size: int = 300000):
+        self.party = tuple(party)
+        self.cap = 0 if cap is None else cap
+        self.buckets = buckets
+        self.epsilon = epsilon
+        self.table_size = table_size
+        self.templates = {"hero": CATALOG.hero, **{template.name: template for template in CATALOG.travelers}}
+        # One chain per (party members, enemies), shared by every room so its move cache is
+        # reused; least recently used chains go once the cached moves pass table_size
+        self.chains = OrderedDict()
+
+    def full(self, name: str) -> tuple:
+        template = self.templates[name]
+        return name, template.HP, template.MP
+
+    def chain(self, names: tuple, enemies: tuple) -> BattleChain:
+        key = (names, enemies)
+        chain = self.chains.get(key)
+        if chain is None:
+            heroes = [self.templates[name].create(PlayableCharacter, name) for name in names]
+            foes = [template.create(EnemyCharacter) for template in enemies]
+            chain = self.chains[key] = BattleChain(heroes, foes, self.buckets, self.epsilon)
+        else:
+            self.chains.move_to_end(key)
+        return chain
+
+    def trim(self):
+        cached = sum(len(chain.moves) for chain in self.chains.values())
+        while cached > self.table_size and len(self.chains) > 1:
+            _, chain = self.chains.popitem(last=False)
+            cached -= len(chain.moves)
+
+    # Adds the parties surviving `enemies` to `following` and returns the mass that died
+    def battle(self, parties: dict, enemies: tuple, following: dict) -> float:
+        groups = defaultdict(dict)
+        for party, chance in parties.items():
+            groups[tuple(name for name, _, _ in party)][party] = chance
+        loss = 0.0
+        for names, group in groups.items():
+            chain = self.chain(names, enemies)
+            foes = chain.characters[chain.split:]
+            starts = {}
+            for party, chance in group.items():
+                hp = tuple(HP for _, HP, _ in party) + tuple(foe.MHP for foe in foes)
+                mp = tuple(MP for _, _, MP in party) + tuple(foe.MP for foe in foes)
+                starts[(hp, mp)] = chance
+            wins, lost = chain.run(starts)
+            self.trim()
+            loss += lost
+            for (hps, mps), chance in wins.items():
+                survivors = tuple((name, HP, MP) for name, HP, MP in zip(names, hps, mps) if HP > 0)
+                following[survivors] += chance
+        return loss
+
+    def encounters(self, depth: int) -> dict:
+        counts = table_odds(CATALOG.enemy_counts, depth)
+        kinds = table_odds(CATALOG.enemy_spawns, depth)
+        encounters = defaultdict(float)
+        for count, count_chance in counts:
+            for group in itertools.product(kinds, repeat=count):
+                enemies = tuple(sorted((template for template, _ in group), key=lambda template: template.name))
+                encounters[enemies] += count_chance * math.prod(chance for _, chance in group)
+        return encounters
+
+    # Moves the mass of `states` through one room
+    def room(self, kind: str, states: dict, depth: int, following: dict):
+        if kind == "fountain":
+            for party, chance in states.items():
+                following[tuple(self.full(name) for name, _, _ in party)] += chance
+        elif kind == "traveler":
+            for party, chance in states.items():
+                if len(party) >= self.cap:
+                    following[party] += chance
+                    continue
+                for template in CATALOG.travelers:
+                    following[party + (self.full(template.name),)] += chance / len(CATALOG.travelers)
+        elif kind == "mimic":
+            lure = sum(mimic["disguise"] == RECRUIT for mimic in CATALOG.mimics) / len(CATALOG.mimics)
+            fights = {}
+            for party, chance in states.items():
+                if len(party) >= self.cap:
+                    following[party] += chance * lure
+                    chance *= 1 - lure
+                fights[party] = chance
+            self.battle(fights, (CATALOG.mimic,), following)
+        else:
+            for enemies, chance in self.encounters(depth).items():
+                self.battle({party: mass * chance for party, mass in states.items()}, enemies, following)
+
+    # P(reaching room k) for k = 1..rooms and the expected number of rooms entered, capped at rooms
+    def solve(self, rooms: int) -> dict:
+        states = {tuple(self.full(name) for name in self.party): 1.0}
+        reach = []
+        for depth in range(1, rooms + 1):
+            reach.append(sum(states.values()))
+            following = defaultdict(float)
+            for kind, chance in table_odds(CATALOG.room_spawns, depth):
+                self.room(kind, {party: mass * chance for party, mass in states.items()}, depth, following)
+            states = {party: chance for party, chance in following.items() if chance >= self.epsilon * 1e-3}
+        return {
+            "reach": reach,
+            "expected_rooms": sum(reach),
+            "alive_after": sum(states.values()),
+            "party_states": len(states),
+            "battle_chains": len(self.chains),
+        }
+
+
+def table_odds(table, depth: int) -> list:
+    alias = table.table(depth)
+    odds = defaultdict(float)
+    size = len(alias.items)
+    for index, item in enumerate(alias.items):
+        odds[item] += alias.probability[index] / size
+        odds[alias.items[alias.alias[index]]] += (1 - alias.probability[index]) / size
+    return [(item, chance) for item, chance in odds.items() if chance > 0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Survival curve of a party, computed without simulation")
+    parser.add_argument("--party", nargs="+", default=["hero"], choices=["hero", *(template.name for template in CATALOG.travelers)])
+    parser.add_argument("--cap", type=int, default=None, help="largest party travelers may join, none join by default")
+    parser.add_argument("--rooms", type=int, default=30)
+    parser.add_argument("--buckets", type=int, default=4, help="HP grid points per character")
+    parser.add_argument("--epsilon", type=float, default=1e-6, help="share of a battle below which lines are dropped")
+    parser.add_argument("--table-size", type=int, default=300000, help="battle moves kept cached between rooms")
+    args = parser.parse_args()
+    solver = SurvivalSolver(args.party, args.cap, args.buckets, args.epsilon, args.table_size)
+    print(json.dumps(solver.solve(args.rooms), indent=2))
\ No newline at end of file
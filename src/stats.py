@@ -0,0 +1,149 @@
+import math
+from collections import Counter
+from .enumeration import Behavior, HitType
+
+
+# Counts in logarithmic buckets, so any quantile is within `accuracy` of the true value
+# however many values are added (DDSketch). Merging adds bucket counts, which gives
+# exactly the sketch of the combined values.
+class QuantileSketch:
+    def __init__(self, accuracy: float = 0.01):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = Counter()
+        self.zeros = 0
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value: int, count: int = 1):
+        if value <= 0:
+            self.zeros += count
+        else:
+            self.buckets[math.ceil(math.log(value) / self.log_gamma)] += count
+        self.count += count
+        self.total += value * count
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def merge(self, other: "QuantileSketch"):
+        if other.accuracy != self.accuracy:
+            raise ValueError("Only sketches with the same accuracy can be merged")
+        self.buckets.update(other.buckets)
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                self.minimum = value if self.minimum is None else min(self.minimum, value)
+                self.maximum = value if self.maximum is None else max(self.maximum, value)
+        return self
+
+    # Middle of a bucket, within `accuracy` of every value in it; values are whole numbers
+    def value(self, bucket: int) -> int:
+        return round(2 * self.gamma ** bucket / (self.gamma + 1))
+
+    def quantile(self, q: float) -> int:
+        if self.count == 0:
+            return 0
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if rank < seen:
+                return min(max(self.value(bucket), self.minimum), self.maximum)
+        return self.maximum
+
+    def histogram(self) -> dict:
+        histogram = Counter({0: self.zeros} if self.zeros else {})
+        for bucket, count in self.buckets.items():
+            histogram[self.value(bucket)] += count
+        return dict(sorted(histogram.items()))
+
+    def report(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0,
+            "min": self.minimum,
+            "max": self.maximum,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "histogram": self.histogram(),
+        }
+
+
+# Campaign statistics in fixed memory: it only keeps sketches and counters, so its size
+# depends on how many skills and enemies there are, not on how many runs were played.
+# Listens to battles through Battle.listeners.
+class RunStats:
+    def __init__(self, accuracy: float = 0.01):
+        self.accuracy = accuracy
+        self.runs = 0
+        self.rooms = QuantileSketch(accuracy)
+        self.turns = QuantileSketch(accuracy)
+        # skill name -> sketch of the damage (or healing) of each hit that landed
+        self.damage = {}
+        # skill name -> uses by HitType name
+        self.hits = {}
+        # enemy name -> heroes it killed
+        self.killers = Counter()
+
+    def on_hit(self, user, target, skill, result: dict):
+        hits = self.hits.get(skill.name)
+        if hits is None:
+            hits = self.hits[skill.name] = Counter()
+        hits[result["hit"].name] += 1
+        if result["hit"] != HitType.FAILED:
+            damage = self.damage.get(skill.name)
+            if damage is None:
+                damage = self.damage[skill.name] = QuantileSketch(self.accuracy)
+            damage.add(result["damage"])
+
+    def on_death(self, character, killer):
+        if character.behavior is Behavior.PLAYABLE:
+            self.killers[killer.name] += 1
+
+    def on_finish(self, battle):
+        self.turns.add(battle.turns)
+
+    def add_run(self, dungeon):
+        self.runs += 1
+        self.rooms.add(dungeon.current)
+
+    def merge(self, other: "RunStats"):
+        self.runs += other.runs
+        self.rooms.merge(other.rooms)
+        self.turns.merge(other.turns)
+        for name, sketch in other.damage.items():
+            if name in self.damage:
+                self.damage[name].merge(sketch)
+            else:
+                self.damage[name] = sketch
+        for name, hits in other.hits.items():
+            self.hits.setdefault(name, Counter()).update(hits)
+        self.killers.update(other.killers)
+        return self
+
+    def report(self) -> dict:
+        skills = {}
+        for name, hits in sorted(self.hits.items()):
+            uses = sum(hits.values())
+            damage = self.damage.get(name)
+            skills[name] = {
+                "uses": uses,
+                "crit_rate": hits[HitType.CRIT.name] / uses,
+                "miss_rate": hits[HitType.FAILED.name] / uses,
+                "damage": damage.report() if damage is not None else None,
+            }
+        return {
+            "runs": self.runs,
+            "rooms": self.rooms.report(),
+            "battle_turns": self.turns.report(),
+            "skills": skills,
+            "killers": dict(sorted(self.killers.items(), key=lambda item: (-item[1], item[0]))),
+        }
\ No newline at end of file
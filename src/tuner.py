@@ -0,0 +1,199 @@
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import math
+import os
+from collections import OrderedDict
+from multiprocessing import Pool
+from .functions import rng
+from .catalog import DATA, CATALOG, compile_catalog, install_catalog
+from .policy import GreedyPolicy
+from .character import MainCharacterFactory, PlayableCharacter, PLANNER, planner_settings
+from .room import EnemyRoomFactory
+from .battle import Battle
+from .simulation import headless
+
+CACHE = os.path.join(os.path.dirname(__file__), "data", "tuning.json")
+Z = 1.96
+
+
+def wilson(wins: int, battles: int, z: float = Z) -> tuple:
+    if battles == 0:
+        return 0.0, 1.0
+    rate = wins / battles
+    center = (rate + z * z / (2 * battles)) / (1 + z * z / battles)
+    margin = z * math.sqrt(rate * (1 - rate) / battles + z * z / (4 * battles * battles)) / (1 + z * z / battles)
+    return center - margin, center + margin
+
+
+# Paths look like "hero.HP", "enemies.Goblin.ATK" or "skills.swing.power"
+def apply_overrides(content: dict, overrides: dict) -> dict:
+    content = copy.deepcopy(content)
+    for path, value in overrides.items():
+        section, *keys = path.split(".")
+        node = content[section]
+        if isinstance(node, list):
+            name, *keys = keys
+            node = next(entry for entry in node if entry["name"] == name)
+        for key in keys[:-1]:
+            node = node[key]
+        if keys[-1] not in node:
+            raise KeyError(f"Unknown tuning parameter {path}")
+        node[keys[-1]] = value
+    return content
+
+
+def key_of(overrides: dict, encounter: dict) -> str:
+    return json.dumps({"overrides": overrides, "encounter": encounter}, sort_keys=True)
+
+
+# Digest of every module in the package, since a win rate depends on the whole game and
+# not only on the code that builds the catalog
+def code_digest() -> str:
+    digest = hashlib.sha256()
+    package = os.path.dirname(__file__)
+    for name in sorted(name for name in os.listdir(package) if name.endswith(".py")):
+        digest.update(name.encode("utf-8"))
+        with open(os.path.join(package, name), "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+# Cached results are only valid for the content file and the code they were measured with
+class ResultCache:
+    def __init__(self, path: str = CACHE, data: str = DATA):
+        self.path = path
+        with open(data, "rb") as file:
+            self.content = hashlib.sha1(file.read()).hexdigest()
+        self.code = code_digest()
+        self.results = {}
+        try:
+            with open(path, encoding="utf-8") as file:
+                stored = json.load(file)
+            if stored.get("content") == self.content and stored.get("code") == self.code:
+                self.results = stored["results"]
+        except (OSError, ValueError):
+            pass
+
+    def get(self, key: str) -> list:
+        return self.results.get(key, [0, 0])
+
+    def put(self, key: str, wins: int, battles: int):
+        self.results[key] = [wins, battles]
+
+    def save(self):
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"content": self.content, "code": self.code, "results": self.results}, file)
+        os.replace(temporary, self.path)
+
+
+# Compiled catalogs of the latest candidates, least recently used first
+class Worker:
+    base = None
+    catalogs = OrderedDict()
+    limit = 8
+
+    @staticmethod
+    def setup():
+        headless()
+        with open(DATA, encoding="utf-8") as file:
+            Worker.base = json.load(file)
+
+    @staticmethod
+    def catalog(overrides: dict):
+        key = json.dumps(overrides, sort_keys=True)
+        catalog = Worker.catalogs.get(key)
+        if catalog is None:
+            catalog = Worker.catalogs[key] = compile_catalog(apply_overrides(Worker.base, overrides))
+            if len(Worker.catalogs) > Worker.limit:
+                Worker.catalogs.popitem(last=False)
+        else:
+            Worker.catalogs.move_to_end(key)
+        return catalog
+
+
+def party(travelers: list) -> list:
+    policy = GreedyPolicy()
+    heroes = [MainCharacterFactory().create_character("Hero", policy=policy)]
+    for name in travelers:
+        template = next(template for template in CATALOG.travelers if template.name == name)
+        heroes.append(template.create(PlayableCharacter, name, policy=policy))
+    return heroes
+
+
+# Plays battles [start, stop) of one candidate, each from its own seed. The planner
+# limits come from the candidate's catalog, so they can be tuned too.
+def play_batch(task: tuple) -> tuple:
+    key, overrides, encounter, start, stop = task
+    install_catalog(Worker.catalog(overrides))
+    PLANNER.configure(**planner_settings())
+    factory = EnemyRoomFactory()
+    wins = 0
+    for index in range(start, stop):
+        rng.seed(f"{key}:{index}")
+        PLANNER.reset()
+        room = factory.create_room(encounter["depth"], rng)
+        battle = Battle(party(encounter["travelers"]), room.enemies)
+        battle.main_loop()
+        wins += battle.victory
+    return key, wins, stop - start
+
+
+# Evaluates every candidate in rounds of batches, dropping each one once its
+# win-rate interval is narrower than 2 * margin or it reaches the battle cap
+def tune(candidates: list, encounter: dict, margin=0.03, batch=100, max_battles=5000, workers=None, cache=None) -> list:
+    cache = cache if cache is not None else ResultCache()
+    keys = {key_of(overrides, encounter): overrides for overrides in candidates}
+
+    def pending(key: str) -> bool:
+        wins, battles = cache.get(key)
+        low, high = wilson(wins, battles)
+        return battles < max_battles and (high - low) / 2 > margin
+
+    with Pool(processes=workers or os.cpu_count(), initializer=Worker.setup) as pool:
+        active = [key for key in keys if pending(key)]
+        while active:
+            tasks = []
+            for key in active:
+                done = cache.get(key)[1]
+                tasks.append((key, keys[key], encounter, done, min(done + batch, max_battles)))
+            for key, wins, battles in pool.imap_unordered(play_batch, tasks):
+                total_wins, total_battles = cache.get(key)
+                cache.put(key, total_wins + wins, total_battles + battles)
+            cache.save()
+            active = [key for key in active if pending(key)]
+    results = []
+    for key, overrides in keys.items():
+        wins, battles = cache.get(key)
+        low, high = wilson(wins, battles)
+        results.append({"overrides": overrides, "win_rate": wins / battles if battles else 0.0, "low": low, "high": high, "battles": battles})
+    return results
+
+
+def parse_param(text: str) -> tuple:
+    path, values = text.split("=", 1)
+    return path, [int(value) for value in values.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep catalog stats and estimate the party's win rate for each combination")
+    parser.add_argument("--param", action="append", type=parse_param, default=[], help="path=v1,v2,... e.g. enemies.Goblin.ATK=4,5,6")
+    parser.add_argument("--depth", type=int, default=1, help="room depth the encounters are drawn for")
+    parser.add_argument("--travelers", nargs="*", default=[], help="traveler templates joining the hero")
+    parser.add_argument("--target", type=float, default=None, help="sort by distance to this win rate")
+    parser.add_argument("--margin", type=float, default=0.03, help="stop once the 95%% interval is within +-margin")
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--max-battles", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default=CACHE)
+    args = parser.parse_args()
+    paths = [path for path, _ in args.param]
+    candidates = [dict(zip(paths, values)) for values in itertools.product(*(values for _, values in args.param))]
+    encounter = {"depth": args.depth, "travelers": args.travelers}
+    results = tune(candidates, encounter, args.margin, args.batch, args.max_battles, args.workers, ResultCache(args.cache))
+    if args.target is not None:
+        results.sort(key=lambda result: abs(result["win_rate"] - args.target))
+    print(json.dumps(results, indent=2))
\ No newline at end of file
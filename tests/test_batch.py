@@ -0,0 +1,56 @@
+import math
+import pytest
+from src.simulation import headless
+from src.functions import rng
+from src.battle import Battle
+from src.character import EnemyCharacter
+from src.catalog import CATALOG
+from src.policy import GreedyPolicy, RandomPolicy
+from src.tuner import party
+
+np = pytest.importorskip("numpy")
+from src.batch import BatchBattle
+
+BATTLES = 2000
+# Allowed gap between the two estimates, in standard errors of their difference
+SIGMAS = 4
+# One encounter with a healer on the party, one with area skills on both sides
+ENCOUNTERS = [(["Healer"], ["Goblin", "Orc", "Wizard"]), (["AoE"], ["Slime", "Goblin", "Goblin", "Wizard"])]
+POLICIES = {"greedy": GreedyPolicy, "random": RandomPolicy}
+
+
+def fighters(travelers: list, enemies: list, policy) -> tuple:
+    heroes = party(travelers)
+    for hero in heroes:
+        hero.policy = policy
+    templates = {template.name: template for template in CATALOG.enemies}
+    return heroes, [templates[name].create(EnemyCharacter) for name in enemies]
+
+
+def sequential(travelers: list, enemies: list, rule: str) -> tuple:
+    headless()
+    rng.seed(rule)
+    victories, turns = [], []
+    for _ in range(BATTLES):
+        battle = Battle(*fighters(travelers, enemies, POLICIES[rule]()))
+        battle.main_loop()
+        victories.append(battle.victory)
+        turns.append(battle.turns)
+    return np.array(victories, dtype=float), np.array(turns, dtype=float)
+
+
+def close(a, b) -> bool:
+    error = math.sqrt((a.var() + b.var()) / BATTLES)
+    return abs(a.mean() - b.mean()) <= SIGMAS * max(error, 1 / BATTLES)
+
+
+# Both resolvers draw from the same outcome distribution: win rate and mean length
+# agree within SIGMAS standard errors over BATTLES fights each
+@pytest.mark.parametrize("rule", POLICIES)
+@pytest.mark.parametrize("travelers,enemies", ENCOUNTERS)
+def test_batch_matches_battle(travelers, enemies, rule):
+    victories, turns = sequential(travelers, enemies, rule)
+    batch = BatchBattle(*fighters(travelers, enemies, None), BATTLES, policy=rule, seed=0).run()
+    assert batch.done.all()
+    assert close(victories, batch.victory.astype(float))
+    assert close(turns, batch.turns.astype(float))
\ No newline at end of file
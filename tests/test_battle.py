@@ -0,0 +1,102 @@
+from src.simulation import headless
+from src.functions import rng
+from src.battle import Battle
+from src.character import MainCharacterFactory, PlannerEnemy
+from src.catalog import CATALOG
+from src.journal import Journal
+from src.planner import Planner
+from src.policy import GreedyPolicy
+from src.printer import Printer
+
+
+def battle(planner=None) -> Battle:
+    headless()
+    heroes = [MainCharacterFactory().create_character(f"Hero {index}", policy=GreedyPolicy()) for index in range(2)]
+    enemies = [CATALOG.enemies[index].create(PlannerEnemy, planner=planner) for index in range(3)]
+    return Battle(heroes, enemies)
+
+
+# Everything a rollback has to restore, including who is still on each side
+def state(battle: Battle) -> tuple:
+    characters = tuple((character.name, character.HP, character.MP, character.modifiers)
+                       for character in [*battle.heroes, *battle.enemies])
+    return characters, battle.turns, battle.over, battle.victory, tuple(Printer.log), rng.random()
+
+
+def steps(battle: Battle, count: int):
+    for _ in range(count):
+        battle.step()
+
+
+def test_nested_rollback_under_the_planner():
+    rng.seed(3)
+    planner = Planner()
+    planner.reset()
+    fight = battle(planner)
+    outer = fight.checkpoint()
+    at_outer = state(fight)
+    steps(fight, 3)
+    inner = fight.checkpoint()
+    at_inner = state(fight)
+    planner.clear()
+    steps(fight, 4)
+    played = state(fight)
+    fight.rollback(inner)
+    assert state(fight) == at_inner
+    planner.clear()
+    steps(fight, 4)
+    assert state(fight) == played
+    fight.rollback(outer)
+    assert state(fight) == at_outer
+
+
+# A checkpoint that is never committed only journals its own battle, and only until it ends
+def test_open_checkpoint_stays_with_its_battle():
+    rng.seed(5)
+    first, second = battle(), battle()
+    first.checkpoint()
+    first.step()
+    recorded = len(first.journal)
+    assert Journal.active is None
+    second.main_loop()
+    assert len(first.journal) == recorded
+    first.main_loop()
+    assert first.journal is None
+
+
+def test_interleaved_checkpoints_roll_back_separately():
+    rng.seed(7)
+    first, second = battle(), battle()
+    first_mark, second_mark = first.checkpoint(), second.checkpoint()
+    first_state = state(first)[0]
+    second_state = state(second)[0]
+    for _ in range(4):
+        first.step()
+        second.step()
+    first.rollback(first_mark)
+    assert state(first)[0] == first_state
+    second.rollback(second_mark)
+    assert state(second)[0] == second_state
+
+# Plays a battle the way main_loop does, optionally with a checkpoint around the first step
+def outcome(seed: int, checkpoint: bool) -> tuple:
+    rng.seed(seed)
+    Printer.log.clear()
+    planner = Planner()
+    planner.reset()
+    fight = battle(planner)
+    fight.start()
+    if checkpoint:
+        fight.checkpoint()
+        fight.step()
+        fight.commit()
+    while not fight.over:
+        fight.step()
+    fight.finish()
+    return state(fight)
+
+
+# A checkpoint that is committed without a rollback leaves the game as it would have been
+def test_checkpoint_without_rollback_changes_nothing():
+    for seed in range(5):
+        assert outcome(seed, True) == outcome(seed, False)
\ No newline at end of file
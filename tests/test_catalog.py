@@ -0,0 +1,38 @@
+import os
+import pickle
+import shutil
+from src.catalog import DATA, Catalog, load_catalog
+
+
+def copy_content(tmp_path) -> tuple:
+    path = tmp_path / "content.json"
+    shutil.copyfile(DATA, path)
+    return str(path), str(tmp_path / "content.cache")
+
+
+def test_cache_is_reused(tmp_path):
+    path, cache = copy_content(tmp_path)
+    load_catalog(path, cache)
+    with open(cache, "rb") as file:
+        stamp, _ = pickle.load(file)
+    with open(cache, "wb") as file:
+        pickle.dump((stamp, Catalog.__new__(Catalog)), file)
+    assert not hasattr(load_catalog(path, cache), "modifiers")
+
+
+# A cache keyed only on the data file, as written before the compiler was part of the key
+def test_cache_from_other_code_is_rebuilt(tmp_path):
+    path, cache = copy_content(tmp_path)
+    with open(cache, "wb") as file:
+        pickle.dump((os.stat(path).st_mtime_ns, Catalog.__new__(Catalog)), file)
+    assert load_catalog(path, cache).modifiers
+
+
+def test_unreadable_cache_is_rebuilt(tmp_path):
+    path, cache = copy_content(tmp_path)
+    with open(cache, "wb") as file:
+        file.write(pickle.dumps((0, None))[:-3])
+    assert load_catalog(path, cache).modifiers
+    with open(cache, "wb") as file:
+        pickle.dump(("stamp", "catalog", "extra"), file)
+    assert load_catalog(path, cache).modifiers
\ No newline at end of file
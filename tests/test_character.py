@@ -0,0 +1,31 @@
+from src.functions import rng
+from src.catalog import CATALOG
+from src.character import MainCharacterFactory, EnemyFactory, CharacterDecorator
+from src.policy import GreedyPolicy
+
+
+# Writes through a decorator land on the wrapped character, not on the decorator
+def test_decorator_forwards_writes():
+    hero = MainCharacterFactory().create_character("Hero", policy=GreedyPolicy())
+    decorated = CharacterDecorator(hero)
+    decorated.HP = 5
+    decorated.name = "Decorated"
+    decorated.add_modifier(CATALOG.modifiers["war_cry"])
+    assert (hero.HP, hero.name, decorated.HP) == (5, "Decorated", 5)
+    assert hero.get_ATK() == decorated.get_ATK() == hero.ATK + 3
+    decorated.tick()
+    decorated.clear_timed()
+    assert hero.modifiers == () and hero.get_ATK() == hero.ATK
+
+
+def test_hero_starts_with_equipment():
+    hero = MainCharacterFactory().create_character("Hero", policy=GreedyPolicy(), equipment=["iron_sword", "leather_armor"])
+    assert (hero.get_ATK(), hero.get_DEF(), hero.get_RES()) == (hero.ATK + 2, hero.DEF + 1, hero.RES + 1)
+    hero.clear_timed()
+    assert len(hero.modifiers) == 2
+
+
+def test_enemy_factory_sets_template():
+    rng.seed(1)
+    enemy = EnemyFactory().create_character("")
+    assert enemy.template in CATALOG.enemies
\ No newline at end of file
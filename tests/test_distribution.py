@@ -0,0 +1,51 @@
+import itertools
+import pytest
+from src.catalog import CATALOG
+from src.character import MainCharacterFactory, EnemyCharacter
+from src.distribution import dice_pmf
+from src.policy import GreedyPolicy
+
+
+def fighters() -> list:
+    hero = MainCharacterFactory().create_character("Hero", policy=GreedyPolicy())
+    enemies = [template.create(EnemyCharacter) for template in CATALOG.enemies]
+    return [hero, *enemies]
+
+
+# Uses the skill once for every d20 and every face of every die, with dice_roll handing
+# out exactly those rolls, and counts how often each outcome comes up
+def enumerate_uses(skill, user, target, monkeypatch) -> dict:
+    attack = skill.use_strategy
+    hits = range(1, 21) if skill.critical else [None]
+    faces = list(itertools.product(range(1, attack.die + 1), repeat=attack.dice))
+    rolls = []
+    monkeypatch.setattr("src.skill.dice_roll", lambda sides, dice: rolls.pop(0))
+    counts = {}
+    for hit, roll in itertools.product(hits, faces):
+        rolls[:] = [sum(roll)] if hit is None else [hit, sum(roll)]
+        damage = skill.use(user, target)["damage"]
+        counts[damage] = counts.get(damage, 0) + 1
+    total = len(hits) * len(faces)
+    return {damage: count / total for damage, count in counts.items()}
+
+
+@pytest.mark.parametrize("die,dice", [(4, 2), (6, 3), (20, 1)])
+def test_dice_pmf_matches_enumeration(die, dice):
+    faces = list(itertools.product(range(1, die + 1), repeat=dice))
+    expected = {}
+    for roll in faces:
+        expected[sum(roll)] = expected.get(sum(roll), 0) + 1 / len(faces)
+    assert dice_pmf(die, dice) == pytest.approx(expected)
+
+
+# The table a planner reads is the distribution of what using the skill actually does,
+# for every catalog skill between the hero and each enemy, both ways round
+@pytest.mark.parametrize("skill", CATALOG.skills.values(), ids=list(CATALOG.skills))
+def test_damage_table_matches_the_skill(skill, monkeypatch):
+    characters = fighters()
+    for user, target in itertools.permutations(characters, 2):
+        table = skill.distribution(user, target)
+        assert sum(table.pmf) == pytest.approx(1)
+        expected = enumerate_uses(skill, user, target, monkeypatch)
+        assert {damage: chance for damage, chance in enumerate(table.pmf) if chance} == pytest.approx(expected)
+        assert table.mean == pytest.approx(sum(damage * chance for damage, chance in expected.items()))
\ No newline at end of file
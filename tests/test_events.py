@@ -0,0 +1,73 @@
+from collections import defaultdict
+from src.simulation import headless
+from src.functions import rng
+from src.character import MainCharacterFactory
+from src.enumeration import HitType
+from src.battle import Battle
+from src.policy import GreedyPolicy
+from src.room import Dungeon, Room
+from src.events import COLUMNS, ROOM, HIT, DEATH, HEAL, ColumnWriter, EventRecorder, open_events, summarize
+
+
+# Keeps the same events as EventRecorder, as plain tuples in the order of COLUMNS
+class Collector(EventRecorder):
+    def __init__(self):
+        self.rows = []
+        super().__init__(self)
+
+    def append(self, run, room, kind, actor, skill="", target="", roll=0, damage=0, hit=0, hp=0):
+        self.rows.append((run, room, kind, actor, skill, target, roll, damage, hit, hp))
+
+
+def played(tmp_path) -> tuple:
+    headless()
+    rng.seed(5)
+    writer = ColumnWriter(str(tmp_path), chunk=7)
+    recorders = [EventRecorder(writer), Collector()]
+    for recorder in recorders:
+        recorder.attach()
+    try:
+        for run in range(3):
+            for recorder in recorders:
+                recorder.start_run(run)
+            hero = MainCharacterFactory().create_character("Hero", policy=GreedyPolicy())
+            Dungeon([hero]).explore(max_rooms=12)
+    finally:
+        for recorder in recorders:
+            recorder.detach()
+    writer.close()
+    return recorders[1].rows, open_events(str(tmp_path))
+
+
+def rows_of(part) -> list:
+    columns = [part.column(name) for name, _ in COLUMNS]
+    names = (3, 4, 5)
+    return [tuple(part.names[value] if position in names else value for position, value in enumerate(row))
+            for row in zip(*columns)]
+
+
+# What the written columns read back as is exactly what the battles reported
+def test_columns_round_trip(tmp_path):
+    rows, parts = played(tmp_path)
+    assert len(parts) == 1 and len(parts[0]) == len(rows)
+    assert rows_of(parts[0]) == rows
+    assert {row[2] for row in rows} == {ROOM, HIT, DEATH, HEAL}
+    for part in parts:
+        part.close()
+    assert not Battle.listeners and not Room.listeners
+
+
+# Misses count as events but not towards the mean damage, heals have their own mean
+def test_summary_leaves_out_misses_and_heals(tmp_path):
+    rows, parts = played(tmp_path)
+    landed = defaultdict(list)
+    for _, _, kind, _, skill, _, _, damage, hit, _ in rows:
+        if kind in (HIT, HEAL) and hit != HitType.FAILED.value:
+            landed[kind, skill].append(damage)
+    assert any(hit == HitType.FAILED.value for *_, hit, _ in rows)
+    summary = summarize(parts)
+    assert summary["events"]["hit"] == sum(row[2] == HIT for row in rows)
+    assert summary["mean_damage"] == {skill: sum(values) / len(values) for (kind, skill), values in sorted(landed.items()) if kind == HIT}
+    assert summary["mean_healing"] == {skill: sum(values) / len(values) for (kind, skill), values in sorted(landed.items()) if kind == HEAL}
+    for part in parts:
+        part.close()
\ No newline at end of file
@@ -0,0 +1,29 @@
+from src.enumeration import LogLevel
+from src.farm import farm
+from src.log import Log
+
+
+# Entries reach the file a whole batch at a time, and closing writes the rest
+def test_sink_flushes_in_batches(tmp_path):
+    path = tmp_path / "run.log"
+    log = Log(batch=3)
+    log.open_sink(str(path))
+    log.add("one")
+    log.add("two", LogLevel.WARNING)
+    assert not path.exists()
+    log.add("three")
+    assert path.read_text(encoding="utf-8").splitlines() == ["INFO one", "WARNING two", "INFO three"]
+    log.add("four")
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 3
+    log.close_sink()
+    assert path.read_text(encoding="utf-8").splitlines()[-1] == "INFO four"
+    log.add("five")
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 4
+
+
+def test_farm_writes_one_log_per_chunk(tmp_path):
+    farm(4, workers=1, max_rooms=5, chunk=2, log=str(tmp_path))
+    parts = sorted(path.name for path in tmp_path.iterdir())
+    assert parts == ["part-00000000.log", "part-00000002.log"]
+    for part in parts:
+        assert "INFO Entered room 1" in (tmp_path / part).read_text(encoding="utf-8").splitlines()
\ No newline at end of file
@@ -0,0 +1,11 @@
+from benchmarks.memory import measure, failures
+
+
+# An endless run with pooled rooms and enemies holds its memory once warmed up: 16 KiB over
+# 400 rooms catches anything kept per room. The planner table is not emptied; a small one
+# fills during the warmup and has to stay within its size.
+def test_endless_run_holds_memory():
+    result = measure(rooms=400, warmup=200, table_size=2000)
+    assert failures(result, 16 * 1024) == [], result["top"]
+    assert result["planner_entries"] == result["planner_limit"]
+    assert result["enemy_misses"] <= 16 and result["room_misses"] <= 8
\ No newline at end of file
@@ -0,0 +1,37 @@
+from src.simulation import headless
+from src.functions import rng
+from src.battle import Battle
+from src.character import MainCharacterFactory, EnemyFactory
+from src.catalog import CATALOG
+from src.enumeration import AttackType
+from src.policy import GreedyPolicy
+from src.profiler import Profiler
+
+
+def skill_of(attack_type):
+    return next(skill for skill in CATALOG.skills.values() if skill.type == attack_type)
+
+
+# Heals and enemy deaths are counted apart from hits and hero deaths
+def test_events_are_split_by_kind():
+    headless()
+    rng.seed(11)
+    hero = MainCharacterFactory().create_character("Hero", policy=GreedyPolicy())
+    enemy = EnemyFactory().create_character("")
+    battle = Battle([hero], [enemy])
+    profile = Profiler.enable()
+    try:
+        hero.HP = 1
+        battle.applyDamage(hero, [hero], skill_of(AttackType.HEAL))
+        enemy.HP = 1
+        attempts = 0
+        while enemy in battle.enemies:
+            battle.applyDamage(hero, [enemy], skill_of(AttackType.PHYSICAL))
+            attempts += 1
+    finally:
+        assert Profiler.disable() is profile
+    assert profile.events["heals"] == 1
+    assert profile.events["hits"] + profile.events["misses"] == attempts
+    assert profile.events["hits"] == 1
+    assert (profile.events["enemy_deaths"], profile.events["hero_deaths"]) == (1, 0)
+    assert Battle.listeners == []
\ No newline at end of file
@@ -0,0 +1,44 @@
+import random
+import pytest
+from src.simulation import headless
+from src.printer import Printer
+from src.replay import Recording, record, replay
+
+# Answers typed by a scripted player; some are out of range and asked again
+ANSWERS = ["1", "2", "3", "x"]
+MAX_ANSWERS = 60
+
+
+class Player:
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.answers = 0
+
+    def __call__(self, prompt=""):
+        self.answers += 1
+        if self.answers > MAX_ANSWERS:
+            raise EOFError()
+        return self.rng.choice(ANSWERS)
+
+
+def final(dungeon) -> tuple:
+    return dungeon.current, [(member.name, member.HP, member.MP) for member in dungeon.party]
+
+
+# A run played through HumanPolicy replays to the same room and party from its bytes,
+# whether the hero died or the player stopped answering
+@pytest.mark.parametrize("seed", range(5))
+def test_recorded_run_replays_the_same(seed, monkeypatch):
+    headless()
+    Printer.log.clear()
+    monkeypatch.setattr("builtins.input", Player(seed))
+    dungeon, recording = record("Hero", seed=seed)
+    try:
+        dungeon.cicle()
+    except EOFError:
+        pass
+    played = final(dungeon)
+    assert len(recording.choices) > 0
+    loaded = Recording.from_bytes(recording.to_bytes())
+    assert loaded.choices == recording.choices
+    assert final(replay(loaded)) == played
\ No newline at end of file
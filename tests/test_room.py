@@ -0,0 +1,76 @@
+from src.simulation import headless
+from src.functions import rng
+from src.character import MainCharacterFactory, PLANNER
+from src.policy import GreedyPolicy
+from src.printer import Printer
+from src.room import Dungeon, RoomGenerator
+
+# Planner enemies start at room 25 and keep a table across rooms that saves do not carry
+MAX_ROOMS = 24
+
+
+def layout(generator: RoomGenerator, rooms: int, prefetch: bool) -> list:
+    kinds = []
+    for _ in range(rooms):
+        room = generator.next()
+        kinds.append((type(room).__name__, room.center))
+        if prefetch:
+            generator.prefetch()
+    return kinds
+
+
+# Rooms come from the generator's own stream, when they are built does not change them
+def test_prefetch_timing_keeps_the_layout():
+    assert layout(RoomGenerator(7), 30, False) == layout(RoomGenerator(7), 30, True)
+
+
+# Handing out a prefetched room builds nothing, an empty queue is refilled in one batch
+def test_next_only_builds_when_empty():
+    generator = RoomGenerator(7, lookahead=4)
+    generator.prefetch()
+    generator.next()
+    assert (generator.depth, len(generator.queue)) == (4, 3)
+    for _ in range(3):
+        generator.next()
+    generator.next()
+    assert (generator.depth, len(generator.queue)) == (8, 3)
+
+
+# Without a player to wait for, exploring never builds ahead beyond next()'s batches
+def test_headless_explore_builds_in_batches():
+    headless()
+    rng.seed(0)
+    hero = MainCharacterFactory().create_character("Hero", policy=GreedyPolicy())
+    hero.MHP = hero.HP = 10 ** 9
+    dungeon = Dungeon([hero], lookahead=4)
+    dungeon.explore(max_rooms=10)
+    assert (dungeon.current, dungeon.rooms.depth, len(dungeon.rooms.queue)) == (10, 12, 2)
+
+# Room reached, party stats and log at the end of a greedy run, optionally saved to a file
+# after `split` rooms and resumed from it with the random stream and log scrambled meanwhile
+def greedy_run(seed: int, path=None, split=None) -> tuple:
+    headless()
+    rng.seed(seed)
+    PLANNER.reset()
+    Printer.log.clear()
+    dungeon = Dungeon([MainCharacterFactory().create_character("Hero", policy=GreedyPolicy())])
+    while len(dungeon.party) > 0 and dungeon.current < MAX_ROOMS:
+        dungeon.step()
+        if dungeon.current == split and len(dungeon.party) > 0:
+            dungeon.save(path)
+            rng.seed("elsewhere")
+            Printer.log.clear()
+            dungeon = Dungeon.load(path, policy=GreedyPolicy())
+    party = [(member.name, member.HP, member.MP, member.MHP, member.MMP, tuple(member.skills)) for member in dungeon.party]
+    return dungeon.current, party, list(Printer.log)
+
+
+def test_resumed_run_continues_exactly(tmp_path):
+    path = str(tmp_path / "run.save")
+    resumed = 0
+    for seed in range(20):
+        played = greedy_run(seed)
+        if played[0] > 3:
+            resumed += 1
+            assert greedy_run(seed, path, split=3) == played
+    assert resumed >= 5
\ No newline at end of file
@@ -0,0 +1,53 @@
+from src.simulation import headless
+from src.functions import rng
+from src.battle import HordeBattle
+from src.catalog import CATALOG
+from src.character import MainCharacterFactory, EnemyFactory, ENEMY_POOL
+from src.policy import GreedyPolicy
+from src.roster import Roster
+
+
+def rosters(size: int) -> tuple:
+    rng.seed(size)
+    heroes, enemies = Roster(), Roster()
+    for index in range(size):
+        heroes.add(MainCharacterFactory().create_character(f"Hero {index}", policy=GreedyPolicy()))
+        enemies.add(EnemyFactory().create_character(""))
+    return heroes, enemies
+
+
+# The battle only sees views, every hit lands in the roster columns
+def test_horde_battle_from_rosters():
+    headless()
+    heroes, enemies = rosters(20)
+    battle = HordeBattle.from_rosters(heroes, enemies)
+    battle.main_loop()
+    assert battle.over
+    losers = enemies if battle.victory else heroes
+    assert losers.alive() == []
+    assert all(HP == 0 for HP in losers.columns["HP"])
+    assert len(heroes.alive() if battle.victory else enemies.alive()) == len(battle.heroes if battle.victory else battle.enemies)
+
+# Modifiers are stored per index, every view of a character sees the same ones
+def test_roster_modifiers():
+    heroes, enemies = rosters(2)
+    heroes[0].add_modifier(CATALOG.modifiers["war_cry"])
+    enemies[1].add_modifier(CATALOG.modifiers["weakened"])
+    assert heroes[0].get_ATK() == heroes.columns["ATK"][0] + 3
+    assert heroes[1].get_ATK() == heroes.columns["ATK"][1]
+    assert enemies[1].get_DEF() == max(0, enemies.columns["DEF"][1] - 2)
+    for _ in range(3):
+        heroes[0].tick()
+    assert heroes[0].modifiers == () and heroes[0].get_ATK() == heroes.columns["ATK"][0]
+
+
+def test_roster_keeps_equipment():
+    roster = Roster()
+    view = roster.add(MainCharacterFactory().create_character("Hero", policy=GreedyPolicy(), equipment=["iron_sword"]))
+    assert view.get_ATK() == view.ATK + 2
+
+def test_releasing_a_roster_enemy_does_not_pool_it():
+    _, enemies = rosters(1)
+    before = sum(len(free) for free in ENEMY_POOL.free.values())
+    enemies[0].release()
+    assert sum(len(free) for free in ENEMY_POOL.free.values()) == before
\ No newline at end of file
@@ -0,0 +1,45 @@
+import math
+import random
+from collections import Counter
+import pytest
+from src.catalog import CATALOG
+from src.sampling import AliasTable, SpawnTable
+
+DRAWS = 20000
+
+
+# Chance of each item as the table hands it out: its own column plus what other columns alias to it
+def alias_probabilities(table: AliasTable) -> list:
+    size = len(table.items)
+    chances = [probability / size for probability in table.probability]
+    for index, alias in enumerate(table.alias):
+        chances[alias] += (1 - table.probability[index]) / size
+    return chances
+
+
+def expected(spawns: SpawnTable, depth: int) -> list:
+    depth = min(depth, spawns.cap) // spawns.bucket * spawns.bucket
+    weights = [max(0.0, base + slope * depth) for base, slope in spawns.weights]
+    return [weight / sum(weights) for weight in weights]
+
+
+def check(spawns: SpawnTable, depth: int):
+    chances = expected(spawns, depth)
+    assert alias_probabilities(spawns.table(depth)) == pytest.approx(chances, abs=1e-12)
+    rng = random.Random(depth)
+    counts = Counter(spawns.sample(depth, rng) for _ in range(DRAWS))
+    for item, chance in zip(spawns.items, chances):
+        error = math.sqrt(chance * (1 - chance) / DRAWS)
+        assert abs(counts[item] / DRAWS - chance) <= 4 * error
+
+
+@pytest.mark.parametrize("table", ["room_spawns", "enemy_counts", "enemy_spawns"])
+@pytest.mark.parametrize("depth", [1, 25, 250])
+def test_catalog_tables_follow_their_weights(table, depth):
+    check(getattr(CATALOG, table), depth)
+
+
+# Weights move with the depth bucket, stop at the cap, and never go below zero
+@pytest.mark.parametrize("depth", [0, 25, 90])
+def test_weights_follow_depth(depth):
+    check(SpawnTable(["a", "b", "c"], [(1, 0), (0, 0.1), (5, -0.1)], bucket=10, cap=40), depth)
\ No newline at end of file
@@ -0,0 +1,22 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from src.printer import Printer
+from src.server import Session, StreamPrinter, worker_init
+
+
+async def transcript(executor, prompts: int) -> str:
+    session = Session("Tester", seed=42)
+    chunks = [await session.start(executor)]
+    while not session.over and len(chunks) <= prompts:
+        chunks.append(await session.answer(0, executor))
+    return "".join(chunks)
+
+
+# Replays in worker processes restore everything from the snapshot, so they play the same
+def test_replays_in_workers_match_inline():
+    Printer.install(StreamPrinter)
+    inline = asyncio.run(transcript(None, 30))
+    with ProcessPoolExecutor(max_workers=2, initializer=worker_init) as executor:
+        pooled = asyncio.run(transcript(executor, 30))
+    assert pooled == inline
+    assert inline.count("Option: ") >= 10
\ No newline at end of file
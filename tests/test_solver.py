@@ -0,0 +1,36 @@
+import math
+from src.simulation import headless
+from src.functions import rng
+from src.character import MainCharacterFactory
+from src.policy import GreedyPolicy
+from src.room import Dungeon
+from src.solver import SurvivalSolver, RECRUIT
+
+ROOMS = 6
+RUNS = 4000
+# Allowed gap between the solver and the simulated runs, in standard errors of the runs
+SIGMAS = 4
+
+
+# The party the solver assumes by default: greedy, but no traveler ever joins
+class Loner(GreedyPolicy):
+    def yes_no(self, question):
+        return RECRUIT not in question
+
+
+# Even on the solver's coarse grid of 4 HP points, the chance of reaching each room is the
+# one a few thousand played runs give, within SIGMAS standard errors
+def test_survival_matches_simulation():
+    reach = SurvivalSolver(buckets=4).solve(ROOMS)["reach"]
+    headless()
+    rng.seed("solver")
+    reached = [0] * ROOMS
+    for _ in range(RUNS):
+        hero = MainCharacterFactory().create_character("Hero", policy=Loner())
+        current = Dungeon([hero]).explore(max_rooms=ROOMS)
+        for room in range(current):
+            reached[room] += 1
+    for solved, count in zip(reach, reached):
+        rate = count / RUNS
+        error = math.sqrt(rate * (1 - rate) / RUNS)
+        assert abs(solved - rate) <= SIGMAS * max(error, 1 / RUNS)
\ No newline at end of file
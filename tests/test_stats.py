@@ -0,0 +1,51 @@
+import random
+import pytest
+from src.stats import QuantileSketch
+
+
+# Damage-like whole numbers over a few orders of magnitude, with some zeros for misses
+def values(seed: int, count: int = 5000) -> list:
+    rng = random.Random(seed)
+    return [0 if rng.random() < 0.05 else int(rng.lognormvariate(3, 1.5)) for _ in range(count)]
+
+
+def sketch(items: list, accuracy: float = 0.01) -> QuantileSketch:
+    result = QuantileSketch(accuracy)
+    for value in items:
+        result.add(value)
+    return result
+
+
+def totals(result: QuantileSketch) -> tuple:
+    return result.buckets, result.zeros, result.count, result.total, result.minimum, result.maximum
+
+
+# Sketches of parts merge into exactly the sketch of everything, whatever the order
+def test_merge_equals_one_sketch():
+    items = values(1)
+    parts = [sketch(items[:1000]), sketch(items[1000:1001]), sketch([]), sketch(items[1001:])]
+    merged = QuantileSketch()
+    for part in reversed(parts):
+        merged.merge(part)
+    whole = sketch(items)
+    assert totals(merged) == totals(whole)
+    assert merged.report() == whole.report()
+
+
+def test_merge_needs_the_same_accuracy():
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+# Every quantile is within the relative accuracy of the exact one, plus half a point for
+# rounding the bucket middle to a whole number
+@pytest.mark.parametrize("accuracy", [0.01, 0.05])
+@pytest.mark.parametrize("seed", [2, 3])
+def test_quantiles_within_accuracy(accuracy, seed):
+    items = values(seed)
+    result = sketch(items, accuracy)
+    ordered = sorted(items)
+    for step in range(101):
+        q = step / 100
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(result.quantile(q) - exact) <= accuracy * exact + 0.5
\ No newline at end of file
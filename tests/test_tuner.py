@@ -0,0 +1,53 @@
+import pytest
+from src.catalog import CATALOG, DATA
+from src.character import MainCharacterFactory, PLANNER, planner_settings
+from src.policy import GreedyPolicy
+from src.room import Dungeon
+from src.tuner import ResultCache, Worker, play_batch
+
+
+# Every test installs candidate catalogs, the shared one is put back afterwards
+@pytest.fixture
+def worker():
+    saved = dict(CATALOG.__dict__)
+    Worker.setup()
+    yield Worker
+    CATALOG.__dict__.update(saved)
+    PLANNER.configure(**planner_settings())
+    Worker.catalogs.clear()
+
+
+def test_catalog_cache_is_bounded(worker):
+    for value in range(worker.limit + 5):
+        worker.catalog({"hero.HP": 20 + value})
+    assert len(worker.catalogs) == worker.limit
+    assert worker.catalog({"hero.HP": 20 + worker.limit + 4}) is worker.catalogs[next(reversed(worker.catalogs))]
+
+
+def test_planner_follows_the_candidate(worker):
+    play_batch(("planner", {"planner.nodes": 7, "planner.max_depth": 3}, {"depth": 30, "travelers": []}, 0, 2))
+    assert (PLANNER.nodes, PLANNER.max_depth) == (7, 3)
+
+
+# Skills rebuilt by a candidate are new objects, saves must find their ids all the same
+def test_saves_use_the_installed_catalog(worker):
+    skill_id = next(iter(CATALOG.skills))
+    power = CATALOG.skills[skill_id].use_strategy.power
+    play_batch(("skills", {f"skills.{skill_id}.power": power + 1}, {"depth": 1, "travelers": []}, 0, 1))
+    hero = MainCharacterFactory().create_character("Hero", policy=GreedyPolicy())
+    hero.skills.append(CATALOG.skills[skill_id])
+    Dungeon([hero]).to_bytes()
+
+# Results measured with other content or other code are dropped on load
+def test_result_cache_follows_content_and_code(tmp_path, monkeypatch):
+    path = str(tmp_path / "tuning.json")
+    cache = ResultCache(path)
+    cache.put("key", 3, 10)
+    cache.save()
+    assert ResultCache(path).get("key") == [3, 10]
+    monkeypatch.setattr("src.tuner.code_digest", lambda: "other code")
+    assert ResultCache(path).get("key") == [0, 0]
+    monkeypatch.undo()
+    data = tmp_path / "content.json"
+    data.write_bytes(open(DATA, "rb").read() + b" ")
+    assert ResultCache(path, str(data)).get("key") == [0, 0]
\ No newline at end of file